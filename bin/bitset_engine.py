@@ -0,0 +1,176 @@
+"""Columnar check engine evaluating security checks as bitwise operations over attribute bitsets.
+
+Each resource scope is stored as one bitset per attribute, with one bit per resource. A check_query
+made up of `and`, `or`, `not` and attribute lookups is then evaluated as a few whole-column bitwise
+operations rather than a Python level loop per resource.
+"""
+from bin import check_query as query_language
+
+
+def compile_check(check_query):
+    """Compile a check_query into a bitset plan.
+
+    Args:
+        check_query: The check_query value from a security check.
+
+    Returns:
+        The folded query tree, or None if the query uses syntax the bitset engine does not support.
+
+    """
+    try:
+        plan = query_language.fold(query_language.parse(check_query))
+    except SyntaxError:
+        return None
+
+    if not _supported(plan):
+        return None
+
+    return plan
+
+
+def _supported(plan):
+    """Check whether every node of a query tree can be evaluated as bitwise operations.
+
+    Args:
+        plan: The query tree to check.
+
+    Returns:
+        True/False
+
+    """
+    if plan[0] == "attr":
+        return True
+    if plan[0] == "const":
+        return isinstance(plan[1], bool)
+    if plan[0] == "not":
+        return _supported(plan[1])
+    if plan[0] in ("and", "or"):
+        return all(_supported(operand) for operand in plan[1])
+
+    return False
+
+
+def build_index(resources):
+    """Build an empty columnar index for a set of resources.
+
+    Columns are filled lazily the first time an attribute is used by a check.
+
+    Args:
+        resources: Sequence of (resource name, resource configuration) pairs.
+
+    Returns:
+        Dictionary containing resource names, configurations, full mask and columns.
+
+    """
+    return {
+        "names": [resource[0] for resource in resources],
+        "configs": [resource[1] for resource in resources],
+        "mask": (1 << len(resources)) - 1,
+        "columns": {},
+    }
+
+
+def column(index, attribute):
+    """Return the bitset for an attribute, building it on first use.
+
+    A resource missing the attribute raises KeyError from the lookup of its configuration, as
+    evaluating the check for that resource would.
+
+    Args:
+        index: The columnar index from build_index.
+        attribute: The attribute name.
+
+    Returns:
+        Integer bitset with bit N set when resource N has a truthy value for the attribute.
+
+    """
+    try:
+        return index["columns"][attribute]
+    except KeyError:
+        pass
+
+    bits = "".join(
+        "1" if resource_config[attribute] else "0"
+        for resource_config in reversed(index["configs"])
+    )
+    index["columns"][attribute] = int(bits, 2) if bits else 0
+
+    return index["columns"][attribute]
+
+
+def evaluate(plan, index):
+    """Evaluate a bitset plan against a columnar index.
+
+    Args:
+        plan: The plan from compile_check.
+        index: The columnar index from build_index.
+
+    Returns:
+        Integer bitset of resources matching the plan.
+
+    """
+    operator = plan[0]
+    if operator == "attr":
+        return column(index, plan[1])
+    if operator == "not":
+        return ~evaluate(plan[1], index) & index["mask"]
+    if operator == "and":
+        bits = index["mask"]
+        for operand in plan[1]:
+            bits &= evaluate(operand, index)
+        return bits
+    if operator == "or":
+        bits = 0
+        for operand in plan[1]:
+            bits |= evaluate(operand, index)
+        return bits
+
+    return index["mask"] if plan[1] else 0
+
+
+def do_check(check_details, plan, resources, index_cache):
+    """Run a security check using the bitset engine.
+
+    Findings are returned in the same format and order as resource_validator.do_check. None is
+    returned for checks the bitset engine cannot evaluate exactly (unsupported syntax or missing
+    attributes) so that the caller can fall back to the loop engine.
+
+    Args:
+        check_details: A json containing the details for the check to run.
+        plan: The plan from compile_check, or None for an unsupported check.
+        resources: Sequence of (resource name, resource configuration) pairs in the check's
+            resource_scope.
+        index_cache: Dictionary of resource_scope to columnar index, shared across checks.
+
+    Returns:
+        list(dict) or None
+
+    """
+    if plan is None:
+        return None
+
+    resource_scope = tuple(check_details["resource_scope"])
+    if resource_scope not in index_cache:
+        index_cache[resource_scope] = build_index(resources)
+    index = index_cache[resource_scope]
+
+    try:
+        bits = evaluate(plan, index)
+    except KeyError:
+        return None
+
+    insecure_resources = []
+    for position, bit in enumerate(reversed(bin(bits)[2:])):
+        if bit == "1":
+            insecure_resources.append(
+                {
+                    "name": check_details["name"],
+                    "resource": index["names"][position],
+                    "description": check_details["description"],
+                    "check_query": " ".join(check_details["check_query"]),
+                    "remediation": check_details["remediation"],
+                    "severity": check_details["severity"],
+                }
+            )
+
+    return insecure_resources
@@ -0,0 +1,474 @@
+"""Restricted expression language used by the check_query of security checks.
+
+Queries are parsed once with `ast`, translated into a small tree of tuples, simplified and then
+compiled into predicate closures taking a single resource configuration. Only the following
+syntax is accepted:
+
+- `and`, `or`, `not` and parentheses
+- comparisons (`==`, `!=`, `<`, `<=`, `>`, `>=`, `in`, `not in`)
+- constants (strings, numbers, True, False, None) and lists/tuples of constants
+- attribute access, written as `attribute_name`, `resource.attribute_name` or the
+  legacy `resources[resource]["attribute_name"]`
+
+Query trees are tuples of the form:
+
+- ("attr", name)
+- ("const", value)
+- ("not", node)
+- ("and", (node, ...)) / ("or", (node, ...))
+- ("compare", operator name, left, right)
+"""
+import ast
+import operator
+
+# Keyed by the name of the ast operator class so query trees only hold plain values
+COMPARE_OPERATORS = {
+    "Eq": operator.eq,
+    "NotEq": operator.ne,
+    "Lt": operator.lt,
+    "LtE": operator.le,
+    "Gt": operator.gt,
+    "GtE": operator.ge,
+    "In": lambda left, right: left in right,
+    "NotIn": lambda left, right: left not in right,
+}
+
+
+def parse(check_query):
+    """Parse a check_query into a query tree.
+
+    A query that is not valid Python, or that uses syntax outside of the check language, raises
+    SyntaxError.
+
+    Args:
+        check_query: The check_query value from a security check (a string or list of strings).
+
+    Returns:
+        Query tree.
+
+    """
+    if isinstance(check_query, list):
+        check_query = "".join(check_query)
+
+    return _translate(ast.parse(check_query.strip(), mode="eval").body)
+
+
+def _translate(node):
+    """Translate an ast node into a query tree.
+
+    Args:
+        node: The ast node to translate.
+
+    Returns:
+        Query tree.
+
+    Raises:
+        SyntaxError: If the node is outside of the check language.
+
+    """
+    if isinstance(node, ast.BoolOp):
+        return (
+            "and" if isinstance(node.op, ast.And) else "or",
+            tuple(_translate(value) for value in node.values),
+        )
+
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.Not):
+        return ("not", _translate(node.operand))
+
+    if isinstance(node, ast.Compare):
+        comparisons = []
+        left = _translate(node.left)
+        for compare_op, comparator in zip(node.ops, node.comparators):
+            if type(compare_op).__name__ not in COMPARE_OPERATORS:
+                raise SyntaxError(
+                    "Unsupported comparison in check_query: "
+                    + type(compare_op).__name__
+                )
+            right = _translate(comparator)
+            comparisons.append(("compare", type(compare_op).__name__, left, right))
+            left = right
+        if len(comparisons) == 1:
+            return comparisons[0]
+        return ("and", tuple(comparisons))
+
+    if isinstance(node, ast.Constant) and (
+        node.value is None or isinstance(node.value, (str, int, float, bool))
+    ):
+        return ("const", node.value)
+
+    if isinstance(node, (ast.List, ast.Tuple)):
+        values = [_translate(element) for element in node.elts]
+        if any(value[0] != "const" for value in values):
+            raise SyntaxError("Only constants are allowed in check_query lists")
+        return ("const", tuple(value[1] for value in values))
+
+    if isinstance(node, ast.Name) and node.id not in ("resource", "resources"):
+        return ("attr", node.id)
+
+    # resource.<attr>
+    if (
+        isinstance(node, ast.Attribute)
+        and isinstance(node.value, ast.Name)
+        and node.value.id == "resource"
+    ):
+        return ("attr", node.attr)
+
+    # resources[resource]["<attr>"]
+    if (
+        isinstance(node, ast.Subscript)
+        and isinstance(node.slice, ast.Constant)
+        and isinstance(node.slice.value, str)
+        and isinstance(node.value, ast.Subscript)
+        and isinstance(node.value.value, ast.Name)
+        and node.value.value.id == "resources"
+        and isinstance(node.value.slice, ast.Name)
+        and node.value.slice.id == "resource"
+    ):
+        return ("attr", node.slice.value)
+
+    raise SyntaxError("Unsupported syntax in check_query: " + ast.unparse(node))
+
+
+def fold(node):
+    """Fold constant sub-expressions, flatten nested and/or operands and drop repeated operands.
+
+    Args:
+        node: Query tree.
+
+    Returns:
+        Simplified query tree.
+
+    """
+    node_type = node[0]
+
+    if node_type == "not":
+        operand = fold(node[1])
+        if operand[0] == "const":
+            return ("const", not operand[1])
+        return ("not", operand)
+
+    if node_type == "compare":
+        left = fold(node[2])
+        right = fold(node[3])
+        if left[0] == "const" and right[0] == "const":
+            return ("const", COMPARE_OPERATORS[node[1]](left[1], right[1]))
+        return ("compare", node[1], left, right)
+
+    if node_type in ("and", "or"):
+        # An operand with this truth value decides the whole expression
+        deciding_value = node_type == "or"
+        operands = []
+        for operand in node[1]:
+            operand = fold(operand)
+            if operand[0] == node_type:
+                operands.extend(
+                    nested for nested in operand[1] if nested not in operands
+                )
+            elif operand[0] == "const":
+                if bool(operand[1]) == deciding_value:
+                    return ("const", deciding_value)
+            elif operand not in operands:
+                operands.append(operand)
+        if len(operands) == 0:
+            return ("const", not deciding_value)
+        if len(operands) == 1:
+            return operands[0]
+        return (node_type, tuple(operands))
+
+    return node
+
+
+def cost(node):
+    """Estimate the relative cost of evaluating a query tree.
+
+    Args:
+        node: Query tree.
+
+    Returns:
+        Relative cost as an integer.
+
+    """
+    node_type = node[0]
+    if node_type == "const":
+        return 0
+    if node_type == "attr":
+        return 1
+    if node_type == "not":
+        return 1 + cost(node[1])
+    if node_type == "compare":
+        return 1 + cost(node[2]) + cost(node[3])
+
+    return sum(cost(operand) for operand in node[1])
+
+
+def _cost_key(node, parent_type):  # pylint: disable=unused-argument
+    """Sort key ordering cheaper operands first.
+
+    Args:
+        node: Query tree operand.
+        parent_type: The type of the parent node ("and" or "or").
+
+    Returns:
+        Relative cost of the operand.
+
+    """
+    return cost(node)
+
+
+def clause_key(node):
+    """Return a stable string identifying a clause, used to persist clause statistics.
+
+    Args:
+        node: Query tree of type "attr" or "compare".
+
+    Returns:
+        String representation of the clause.
+
+    """
+    return repr(node)
+
+
+def true_rate(node, clause_stats):
+    """Estimate the probability of a query tree being true from observed clause statistics.
+
+    Clauses are assumed to be independent of each other.
+
+    Args:
+        node: Query tree.
+        clause_stats: Dictionary of clause key to [times true, times evaluated].
+
+    Returns:
+        Probability between 0 and 1, or None if a clause of the tree has not been observed.
+
+    """
+    node_type = node[0]
+    if node_type == "const":
+        return 1.0 if node[1] else 0.0
+    if node_type in ("attr", "compare"):
+        observed = clause_stats.get(clause_key(node))
+        if not observed or not observed[1]:
+            return None
+        return observed[0] / observed[1]
+    if node_type == "not":
+        rate = true_rate(node[1], clause_stats)
+        return None if rate is None else 1 - rate
+
+    rates = [true_rate(operand, clause_stats) for operand in node[1]]
+    if None in rates:
+        return None
+    # Probability of every operand being true (and) or false (or)
+    combined = 1.0
+    for rate in rates:
+        combined *= rate if node_type == "and" else 1 - rate
+    return combined if node_type == "and" else 1 - combined
+
+
+def selectivity_key(clause_stats):
+    """Build a sort key running the operands most likely to short-circuit first.
+
+    `or` operands most likely to be true and `and` operands most likely to be false sort first,
+    unobserved operands are treated as even odds and ties are broken by cost. Statistics only
+    change which operand runs first, never the findings: resources missing an attribute, or with
+    a value a comparison raises on, behave as in the original order, see compile_node.
+
+    Args:
+        clause_stats: Dictionary of clause key to [times true, times evaluated].
+
+    Returns:
+        Function taking an operand and the parent node type, for use with reorder.
+
+    """
+
+    def key(node, parent_type):
+        rate = true_rate(node, clause_stats)
+        if rate is None:
+            rate = 0.5
+        return (-rate if parent_type == "or" else rate, cost(node))
+
+    return key
+
+
+def reorder(node, key=_cost_key):
+    """Reorder and/or operands so that the operands sorting first by key run first.
+
+    The sort is stable, operands with equal keys keep their original order.
+
+    Args:
+        node: Query tree.
+        key: Function taking an operand and the parent node type ("and" or "or") and returning
+            a sort key (Default value = _cost_key).
+
+    Returns:
+        Reordered query tree.
+
+    """
+    node_type = node[0]
+    if node_type == "not":
+        return ("not", reorder(node[1], key))
+    if node_type in ("and", "or"):
+        operands = [reorder(operand, key) for operand in node[1]]
+        operands.sort(key=lambda operand: key(operand, node_type))
+        return (node_type, tuple(operands))
+
+    return node
+
+
+def compile_node(node, clause_counts=None, key=None):
+    """Compile a query tree into a predicate closure.
+
+    When a sort key is provided, and/or operands are evaluated in the order of reorder. An operand
+    that raises, such as a missing attribute (KeyError) or a comparison with None (TypeError),
+    only does so if it is reached in the original order: a reordered and/or that raises is
+    evaluated again in the original order, so reordering never turns a query that evaluates into
+    one that raises.
+
+    When clause counts are provided, the result of every clause (attribute lookup or comparison)
+    evaluation is counted in them.
+
+    Args:
+        node: Query tree.
+        clause_counts: Dictionary of clause key to [times true, times evaluated], updated as
+            clauses are evaluated (Default value = None).
+        key: Sort key for and/or operands, see reorder (Default value = None).
+
+    Returns:
+        Function taking a resource configuration and returning the value of the query.
+
+    """
+    node_type = node[0]
+
+    if node_type in ("attr", "compare"):
+        clause = _compile_clause(node)
+        if clause_counts is not None:
+            clause = _counted_clause(clause, clause_counts, clause_key(node))
+
+        return clause
+
+    if node_type == "const":
+        value = node[1]
+        return lambda resource_config: value
+
+    if node_type == "not":
+        operand = compile_node(node[1], clause_counts, key)
+        return lambda resource_config: not operand(resource_config)
+
+    operands = tuple(compile_node(operand, clause_counts, key) for operand in node[1])
+    evaluate = _compile_operands(node_type, operands)
+    if key is None:
+        return evaluate
+
+    order = sorted(
+        range(len(operands)), key=lambda index: key(node[1][index], node_type)
+    )
+    if order == sorted(order):
+        return evaluate
+
+    reordered = _compile_operands(node_type, tuple(operands[index] for index in order))
+
+    def reordered_operands(resource_config):
+        try:
+            return reordered(resource_config)
+        except Exception:
+            # The operand that raised may not be reached in the original order
+            return evaluate(resource_config)
+
+    return reordered_operands
+
+
+def _compile_operands(node_type, operands):
+    """Compile the operands of an and/or node, evaluated in the given order.
+
+    Args:
+        node_type: "and" or "or".
+        operands: Compiled operands.
+
+    Returns:
+        Function taking a resource configuration.
+
+    """
+    if node_type == "and":
+
+        def all_operands(resource_config):
+            for operand in operands:
+                if not operand(resource_config):
+                    return False
+            return True
+
+        return all_operands
+
+    def any_operand(resource_config):
+        for operand in operands:
+            if operand(resource_config):
+                return True
+        return False
+
+    return any_operand
+
+
+def _compile_clause(node):
+    """Compile an attribute lookup or comparison into a closure.
+
+    Args:
+        node: Query tree of type "attr" or "compare".
+
+    Returns:
+        Function taking a resource configuration.
+
+    """
+    if node[0] == "attr":
+        attribute = node[1]
+        return lambda resource_config: resource_config[attribute]
+
+    compare = COMPARE_OPERATORS[node[1]]
+    left = compile_node(node[2])
+    right = compile_node(node[3])
+    return lambda resource_config: compare(
+        left(resource_config), right(resource_config)
+    )
+
+
+def _counted_clause(clause, clause_counts, key):
+    """Wrap a clause so that its results are counted.
+
+    Args:
+        clause: Function from _compile_clause.
+        clause_counts: Dictionary of clause key to [times true, times evaluated].
+        key: The clause key from clause_key.
+
+    Returns:
+        Function with the same signature as the clause.
+
+    """
+    counts = clause_counts.setdefault(key, [0, 0])
+
+    def counted_clause(resource_config):
+        value = clause(resource_config)
+        if value:
+            counts[0] += 1
+        counts[1] += 1
+        return value
+
+    return counted_clause
+
+
+def compile_query(check_query, clause_stats=None, clause_counts=None):
+    """Parse, simplify and compile a check_query into a predicate closure.
+
+    Operands are ordered by observed selectivity when clause statistics are provided, and by
+    cost otherwise. The ordering never changes the value of the query, including for resources
+    missing an attribute or with a value a comparison raises on, see compile_node.
+
+    Args:
+        check_query: The check_query value from a security check (a string or list of strings).
+        clause_stats: Dictionary of clause key to [times true, times evaluated] from earlier
+            runs (Default value = None).
+        clause_counts: Dictionary of clause key to [times true, times evaluated], updated as
+            clauses are evaluated (Default value = None).
+
+    Returns:
+        Function taking a resource configuration and returning the value of the query.
+
+    """
+    key = _cost_key if clause_stats is None else selectivity_key(clause_stats)
+
+    return compile_node(fold(parse(check_query)), clause_counts, key)
@@ -1,33 +1,132 @@
 """Modules to load the configuration files for pytmac from provided data files."""
+import glob
 import json
 import os
 
 import yaml
 
+from bin import parse_cache
+
+# Use the LibYAML bindings when PyYAML was built with them, falling back to pure Python
+try:
+    from yaml import CSafeDumper as YamlDumper
+    from yaml import CSafeLoader as YamlLoader
+except ImportError:
+    from yaml import SafeDumper as YamlDumper
+    from yaml import SafeLoader as YamlLoader
+
+
+class ReportDumper(YamlDumper):  # pylint: disable=too-many-ancestors
+    """YAML dumper writing objects shared between resources in full, rather than as aliases."""
+
+    def ignore_aliases(self, data):
+        """Never use aliases.
+
+        Args:
+            data: The object being written
+
+        Returns:
+            True
+
+        """
+        return True
+
+
 docs_dir = os.path.join(os.path.dirname(__file__), "../", "conf")
 
+RESOURCE_TYPES = ["networks", "users", "databases", "systems", "res_links"]
+# Resource types whose resources must have a unique name
+NAMED_RESOURCE_TYPES = ["networks", "users", "databases", "systems"]
+# Values of the type field of a JSON Lines resource to resource type
+JSONL_RESOURCE_TYPES = {
+    "network": "networks",
+    "user": "users",
+    "database": "databases",
+    "system": "systems",
+    "res_link": "res_links",
+} | {resource_type: resource_type for resource_type in RESOURCE_TYPES}
+
+
+def _parse_yaml(contents):
+    """Parse a YAML document.
+
+    Args:
+        contents: The YAML document as a string
+
+    Returns:
+        The parsed document
+
+    """
+    return yaml.load(contents, Loader=YamlLoader)
+
 
 def resources(file):
     """Return a list of resources to be included in the package.
 
+    The resources can be split across several files by passing a directory (every .yaml, .yml and
+    .jsonl file below it) or a glob pattern such as `model/**/*.yaml`. The files are parsed in
+    order and their resources merged per resource type. Files ending in .jsonl are read as JSON
+    Lines, see iter_jsonl_resources. A file that is not valid YAML raises YAMLError, and a JSON
+    Lines file that is not valid or a resource name defined in more than one file raises
+    ValueError.
+
     Args:
-        file: File to load resources from
+        file: File, directory or glob pattern to load resources from
 
     Returns:
         List of resources
 
     Raises:
         FileNotFoundError: If file is not found
-        YAMLError: If file is not valid YAML
 
     """
     if file == "demo":
         file = docs_dir + "/resources.yaml"
 
+    if os.path.isdir(file):
+        resource_files = sorted(
+            glob.glob(os.path.join(file, "**", "*.yaml"), recursive=True)
+            + glob.glob(os.path.join(file, "**", "*.yml"), recursive=True)
+            + glob.glob(os.path.join(file, "**", "*.jsonl"), recursive=True)
+        )
+    elif glob.has_magic(file):
+        resource_files = sorted(glob.glob(file, recursive=True))
+    else:
+        return _resources_file(file)
+
+    if len(resource_files) == 0:
+        raise FileNotFoundError("No resources files found at " + file)
+
+    # Each file is merged as soon as it is parsed, rather than holding every parsed file at once
+    return merge_resources(
+        resource_files,
+        (_resources_file(resource_file) for resource_file in resource_files),
+    )
+
+
+def _resources_file(file):
+    """Return the resources of a single resources file.
+
+    A JSON Lines file that is not valid raises ValueError, see iter_jsonl_resources.
+
+    Args:
+        file: File to load resources from
+
+    Returns:
+        List of resources
+
+    Raises:
+        FileNotFoundError: If file is not found
+        YAMLError: If file is not valid YAML
+
+    """
+    if file.endswith(".jsonl"):
+        return _jsonl_resources(file)
+
     try:
         with open(file, "r", encoding="UTF-8") as resources_file:
             try:
-                resources_yaml = yaml.safe_load(resources_file)
+                resources_yaml = parse_cache.parse(resources_file, _parse_yaml)
             except yaml.YAMLError as error_message:
                 raise yaml.YAMLError("Failed to load RESOURCE_FILE: " + error_message)
     except FileNotFoundError as error_message:
@@ -36,6 +135,119 @@ def resources(file):
     return resources_yaml
 
 
+def iter_jsonl_resources(file):
+    """Yield the resources of a JSON Lines resources file one line at a time.
+
+    Each line holds a single resource as a json object, with a type field naming its resource type
+    (network, user, database, system or res_link) alongside the fields of the resource, eg:
+
+    {"type": "user", "name": "test_user", "network": "home_network", "description": "Testing user"}
+
+    Args:
+        file: File to load resources from
+
+    Yields:
+        Tuple of the resource type and the resource, without its type field
+
+    Raises:
+        FileNotFoundError: If file is not found
+        ValueError: If a line is not valid JSON or has no valid type
+
+    """
+    try:
+        with open(file, "r", encoding="UTF-8") as resources_file:
+            for line_number, line in enumerate(resources_file, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    resource = json.loads(line)
+                    resource_type = JSONL_RESOURCE_TYPES[resource.pop("type")]
+                except (
+                    ValueError,
+                    KeyError,
+                    TypeError,
+                    AttributeError,
+                ) as error_message:
+                    raise ValueError(
+                        "Failed to load RESOURCE_FILE "
+                        + file
+                        + " line "
+                        + str(line_number)
+                        + ": "
+                        + repr(error_message)
+                    ) from error_message
+                yield resource_type, resource
+    except FileNotFoundError as error_message:
+        raise FileNotFoundError("No resources file found at " + file) from error_message
+
+
+def _jsonl_resources(file):
+    """Return the resources of a JSON Lines resources file, grouping them by type as they are read.
+
+    A missing file raises FileNotFoundError and a line that is not valid JSON or has no valid type
+    raises ValueError, see iter_jsonl_resources.
+
+    Args:
+        file: File to load resources from
+
+    Returns:
+        List of resources
+
+    """
+    grouped_resources = {resource_type: [] for resource_type in RESOURCE_TYPES}
+    for resource_type, resource in iter_jsonl_resources(file):
+        grouped_resources[resource_type].append(resource)
+
+    return {"resources": grouped_resources}
+
+
+def merge_resources(resource_files, resources_yamls):
+    """Merge the resources of several resources files per resource type.
+
+    Args:
+        resource_files: The resources files, used to report duplicates
+        resources_yamls: The resources loaded from each file, in the same order (an iterable)
+
+    Returns:
+        List of resources
+
+    Raises:
+        ValueError: If a resource name is defined more than once for a resource type
+
+    """
+    merged_resources = {resource_type: [] for resource_type in RESOURCE_TYPES}
+    # Resource type to resource name to the file defining it
+    defined_names = {resource_type: {} for resource_type in NAMED_RESOURCE_TYPES}
+
+    for resource_file, resources_yaml in zip(resource_files, resources_yamls):
+        if not resources_yaml or not resources_yaml.get("resources"):
+            continue
+        for resource_type, type_resources in resources_yaml["resources"].items():
+            if not type_resources:
+                continue
+            merged_resources.setdefault(resource_type, [])
+            merged_resources[resource_type].extend(type_resources)
+            if resource_type not in defined_names:
+                continue
+            for resource in type_resources:
+                if "name" not in resource:
+                    continue
+                if resource["name"] in defined_names[resource_type]:
+                    raise ValueError(
+                        "Duplicate "
+                        + resource_type
+                        + " name "
+                        + str(resource["name"])
+                        + " in "
+                        + defined_names[resource_type][resource["name"]]
+                        + " and "
+                        + resource_file
+                    )
+                defined_names[resource_type][resource["name"]] = resource_file
+
+    return {"resources": merged_resources}
+
+
 def config(file):
     """Return a list of config to be included in the package.
 
@@ -56,7 +268,7 @@ def config(file):
     try:
         with open(file, "r", encoding="UTF-8") as config_file:
             try:
-                config_yaml = yaml.safe_load(config_file)
+                config_yaml = parse_cache.parse(config_file, _parse_yaml)
             except yaml.YAMLError as error_message:
                 raise yaml.YAMLError("Failed to load CONFIG_FILE: " + error_message)
     except FileNotFoundError as error_message:
@@ -85,7 +297,7 @@ def defaults(file):
     try:
         with open(file, "r", encoding="UTF-8") as default_file:
             try:
-                default_yaml = yaml.safe_load(default_file)
+                default_yaml = parse_cache.parse(default_file, _parse_yaml)
             except yaml.YAMLError as error_message:
                 raise yaml.YAMLError("Failed to load DEFAULTS_FILE: " + error_message)
     except FileNotFoundError as error_message:
@@ -114,7 +326,9 @@ def security_checks(file):
     try:
         with open(file, "r", encoding="UTF-8") as security_checks_file:
             try:
-                security_checks_yaml = yaml.safe_load(security_checks_file)
+                security_checks_yaml = parse_cache.parse(
+                    security_checks_file, _parse_yaml
+                )
             except yaml.YAMLError as error_message:
                 raise yaml.YAMLError(
                     "Failed to load SECURITY_CHECKS_FILE: " + error_message
@@ -148,7 +362,7 @@ def swagger(file):
     try:
         with open(file, "r", encoding="UTF-8") as swagger_file:
             try:
-                swagger_json = json.loads(swagger_file.read())
+                swagger_json = parse_cache.parse(swagger_file, json.loads)
             except Exception as error_message:
                 raise Exception(
                     "Failed to load SWAGGER_FILE: " + error_message
@@ -175,7 +389,7 @@ def settings():
     try:
         with open(".pytmac", "r", encoding="UTF-8") as settings_file:
             try:
-                settings_yaml = yaml.safe_load(settings_file)
+                settings_yaml = parse_cache.parse(settings_file, _parse_yaml)
             except yaml.YAMLError as error_message:
                 raise yaml.YAMLError(
                     "Failed to load SECURITY_CHECKS_FILE: " + error_message
@@ -186,3 +400,61 @@ def settings():
         ) from error_message
 
     return settings_yaml
+
+
+def batch_manifest(file):
+    """Get and return the models listed in a batch manifest.
+
+    The manifest lists one entry per model under `models`, each with a resource_file,
+    config_file, defaults_file and output_dir and an optional swagger_file. Relative paths are
+    resolved against the directory of the manifest.
+
+    Args:
+        file: File to load the manifest from
+
+    Returns:
+        List of models
+
+    Raises:
+        FileNotFoundError: If file is not found
+        YAMLError: If file is not valid YAML
+        KeyError: If a model is missing a required key
+
+    """
+    try:
+        with open(file, "r", encoding="UTF-8") as manifest_file:
+            try:
+                manifest_yaml = parse_cache.parse(manifest_file, _parse_yaml)
+            except yaml.YAMLError as error_message:
+                raise yaml.YAMLError(
+                    "Failed to load BATCH_MANIFEST: " + str(error_message)
+                )
+    except FileNotFoundError as error_message:
+        raise FileNotFoundError("No batch manifest found at " + file) from error_message
+
+    manifest_dir = os.path.dirname(file)
+    models = []
+    for model in manifest_yaml["models"]:
+        for required_key in [
+            "resource_file",
+            "config_file",
+            "defaults_file",
+            "output_dir",
+        ]:
+            if required_key not in model:
+                raise KeyError(
+                    "Batch manifest model is missing "
+                    + required_key
+                    + ": "
+                    + str(model)
+                )
+        models.append(
+            {
+                key: value
+                if value == "demo"
+                else os.path.join(manifest_dir, os.path.expanduser(value))
+                for key, value in model.items()
+            }
+        )
+
+    return models
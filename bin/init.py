@@ -93,7 +93,7 @@ def create_config_file(project_config):
         with open(
             project_config["config_directory"] + "/config.yaml", "w", encoding="UTF-8"
         ) as config_file_update:
-            yaml.dump(config_input, config_file_update)
+            yaml.dump(config_input, config_file_update, Dumper=get_config.YamlDumper)
     except yaml.YAMLError as error_message:
         raise yaml.YAMLError from error_message
 
@@ -117,7 +117,11 @@ def create_defaults_file(project_config):
     defaults_file = project_config["config_directory"] + "/defaults.yaml"
     try:
         with open(defaults_file, "w", encoding="UTF-8") as defaults_file_update:
-            yaml.dump(get_config.defaults("demo"), defaults_file_update)
+            yaml.dump(
+                get_config.defaults("demo"),
+                defaults_file_update,
+                Dumper=get_config.YamlDumper,
+            )
     except OSError as error_message:
         raise OSError from error_message
     except yaml.YAMLError as error_message:
@@ -171,7 +175,9 @@ def create_resources_file(project_config, all_resources):
     resources_file = project_config["config_directory"] + "/resources.yaml"
     try:
         with open(resources_file, "w", encoding="UTF-8") as resources_file_update:
-            yaml.dump(all_resources, resources_file_update)
+            yaml.dump(
+                all_resources, resources_file_update, Dumper=get_config.YamlDumper
+            )
     except OSError as error_message:
         raise OSError from error_message
     except yaml.YAMLError as error_message:
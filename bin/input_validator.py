@@ -1,8 +1,37 @@
 """Functions that validate the input files provided by the pytmac user."""
+import difflib
 import json
 import logging
 import os
 
+REQUIRED_RESOURCE_TYPES = ["networks", "databases", "users", "systems"]
+# Resource types that belong to a network and can be the source or destination of a res_link
+NETWORK_RESOURCE_TYPES = ["users", "databases", "systems"]
+
+# Resource type to the fields each resource requires and the error logged for resources missing them
+RESOURCE_SCHEMA = {
+    "networks": {
+        "required": ["name"],
+        "error": "name not set for network: ",
+    },
+    "users": {
+        "required": ["name", "network", "description"],
+        "error": "Required field not set for user (Required: name, network, description): ",
+    },
+    "databases": {
+        "required": ["name", "network", "description"],
+        "error": "Required field not set for database (Required: name, network, description): ",
+    },
+    "systems": {
+        "required": ["name", "network", "description"],
+        "error": "Required field not set for system (Required: name, network, description): ",
+    },
+    "res_links": {
+        "required": ["source", "destination", "description"],
+        "error": "Required field not set for res_link (Required: source, destination, description): ",
+    },
+}
+
 
 def config(config_json):
     """Validate required fields in config.json.
@@ -39,6 +68,8 @@ def config(config_json):
 def resources(resources_json):
     """Validate required fields in resources.json.
 
+    Every error found is logged, rather than only the first.
+
     Args:
         resources_json: Json structure containing the app resources
 
@@ -46,100 +77,172 @@ def resources(resources_json):
         True/False
 
     """
-    # Validate top level fields set
-    resource_types = list(resources_json["resources"].keys())
-    required_network_types = ["networks", "databases", "users", "systems"]
-    for required_type in required_network_types:
-        if required_type not in resource_types:
-            logging.error("%s not found in resources", required_type)
-            return False
+    errors = resource_errors(resources_json)
+    for error in errors:
+        logging.error(error["message"])
 
-    # Validate network fields
-    try:
-        for network in resources_json["resources"]["networks"]:
-            network_name = network["name"]
-            logging.debug(json.dumps({"network_name": network_name}))
-    except KeyError:
-        logging.error("name not set for network: %s", str(network))
+    if len(errors) > 0:
+        logging.info(
+            "Invalid resources at: %s",
+            ", ".join(
+                error["path"] + " (missing " + ", ".join(error["missing"]) + ")"
+                if error["missing"]
+                else error["path"]
+                for error in errors
+            ),
+        )
         return False
 
-    # Validate user fields
-    try:
-        for user in resources_json["resources"]["users"]:
-            name = user["name"]
-            network = user["network"]
-            description = user["description"]
-            logging.debug(
-                json.dumps(
-                    {"name": name, "network": network, "description": description}
-                )
+    return True
+
+
+def resource_errors(resources_json):
+    """Validate every resource against RESOURCE_SCHEMA in a single pass, collecting all errors.
+
+    Args:
+        resources_json: Json structure containing the app resources
+
+    Returns:
+        List of errors, each a dictionary with the path of the invalid resource, the required
+        fields it is missing and an error message
+
+    """
+    errors = []
+    resource_types = resources_json["resources"]
+
+    # Validate top level fields set
+    for required_type in REQUIRED_RESOURCE_TYPES:
+        if required_type not in resource_types:
+            errors.append(
+                {
+                    "path": "resources." + required_type,
+                    "missing": [],
+                    "message": required_type + " not found in resources",
+                }
             )
-    except KeyError:
-        logging.error(
-            "Required field not set for user (Required: name, network, description): %s",
-            str(user),
-        )
-        return False
 
-    # Validate database fields
-    try:
-        for database in resources_json["resources"]["databases"]:
-            name = database["name"]
-            network = database["network"]
-            description = database["description"]
-            logging.debug(
-                json.dumps(
-                    {"name": name, "network": network, "description": description}
-                )
+    debug_enabled = logging.getLogger().isEnabledFor(logging.DEBUG)
+    for resource_type, schema in RESOURCE_SCHEMA.items():
+        for position, resource in enumerate(resource_types.get(resource_type) or []):
+            if isinstance(resource, dict) and all(
+                field in resource for field in schema["required"]
+            ):
+                if debug_enabled:
+                    logging.debug(
+                        "Validated %s %s",
+                        resource_type,
+                        {field: resource[field] for field in schema["required"]},
+                    )
+                continue
+            errors.append(
+                {
+                    "path": "resources." + resource_type + "[" + str(position) + "]",
+                    "missing": [
+                        field
+                        for field in schema["required"]
+                        if not isinstance(resource, dict) or field not in resource
+                    ],
+                    "message": schema["error"] + str(resource),
+                }
             )
-    except KeyError:
-        logging.error(
-            "Required field not set for database (Required: name, network, description): %s",
-            str(database),
-        )
-        return False
 
-    # Validate systems fields
-    try:
-        for system in resources_json["resources"]["systems"]:
-            name = system["name"]
-            network = system["network"]
-            description = system["description"]
-            logging.debug(
-                json.dumps(
-                    {"name": name, "network": network, "description": description}
+    return errors
+
+
+def index_resources(resources):
+    """Build an index of resources by name and by network in a single pass over the resources.
+
+    The index is in the format:
+
+    {
+        "names": {[Resource name]: [List of resource types using the name]},
+        "networks": {[Network name]: [Network]},
+        "network_resources": {[Network name]: {[Resource type]: [List of resources]}}
+    }
+
+    Resources keep the order of the resources file within each network and resource type.
+
+    Args:
+        resources: The resource model from resource_model.build.
+
+    Returns:
+        Dictionary of resource names, networks and resources per network.
+
+    """
+    resource_index = {"names": {}, "networks": {}, "network_resources": {}}
+    for network in resources["networks"]:
+        resource_index["networks"][network.name] = network
+    for resource_type in NETWORK_RESOURCE_TYPES:
+        for resource in resources[resource_type]:
+            resource_index["names"].setdefault(resource.name, []).append(resource_type)
+            resource_index["network_resources"].setdefault(
+                resource.network, {"users": [], "databases": [], "systems": []}
+            )[resource_type].append(resource)
+
+    return resource_index
+
+
+def references(resources, resource_index):
+    """Check that every res_link endpoint and resource network names a defined resource.
+
+    Unknown names are logged as warnings with the closest known name as a suggestion.
+
+    Args:
+        resources: The resource model from resource_model.build.
+        resource_index: The index from index_resources.
+
+    Returns:
+        True if every reference is known, False otherwise.
+
+    """
+    unknown_references = 0
+    for network_name, network_resources in resource_index["network_resources"].items():
+        if network_name in resource_index["networks"]:
+            continue
+        for resource_type, type_resources in network_resources.items():
+            for resource in type_resources:
+                unknown_references += 1
+                logging.warning(
+                    "Unknown network %s on %s %s%s",
+                    network_name,
+                    resource_type,
+                    resource.name,
+                    _suggestion(network_name, resource_index["networks"]),
                 )
-            )
-    except KeyError:
-        logging.error(
-            "Required field not set for system (Required: name, network, description): %s",
-            str(system),
-        )
-        return False
 
-    # Validate res_link fields
-    try:
-        for res_link in resources_json["resources"]["res_links"]:
-            source = res_link["source"]
-            destination = res_link["destination"]
-            description = res_link["description"]
-            logging.debug(
-                json.dumps(
-                    {
-                        "source": source,
-                        "destination": destination,
-                        "description": description,
-                    }
+    for res_link in resources["res_links"]:
+        for endpoint in ["source", "destination"]:
+            endpoint_name = getattr(res_link, endpoint)
+            if endpoint_name not in resource_index["names"]:
+                unknown_references += 1
+                logging.warning(
+                    "Unknown res_link %s %s (%s -> %s)%s",
+                    endpoint,
+                    endpoint_name,
+                    res_link.source,
+                    res_link.destination,
+                    _suggestion(endpoint_name, resource_index["names"]),
                 )
-            )
-    except KeyError:
-        logging.error(
-            "Required field not set for res_link (Required: source, destination, description): %s",
-            str(res_link),
-        )
-        return False
 
-    return True
+    return unknown_references == 0
+
+
+def _suggestion(name, known_names):
+    """Return a suggestion of the closest known name for an unknown name.
+
+    Args:
+        name: The unknown name.
+        known_names: The known names.
+
+    Returns:
+        A suggestion to append to a message, or an empty string if no name is close.
+
+    """
+    close_matches = difflib.get_close_matches(str(name), known_names, n=1)
+    if len(close_matches) == 0:
+        return ""
+
+    return ", did you mean " + close_matches[0] + "?"
 
 
 def defaults(defaults_json):
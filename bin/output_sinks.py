@@ -0,0 +1,231 @@
+"""Output sinks writing the pytmac reports concurrently from a single pass over the results.
+
+A sink is a function taking an iterator of (event_type, payload) events, followed by its own
+arguments, and writing one output file. The events are:
+
+    ("report", output_yaml_report): the effective configuration of every resource, shared
+        with the security checks and read-only.
+    ("finding", finding): an insecure resource from resource_validator, in severity order.
+    ("check_stats", check_stats): the statistics of each security check, after the findings.
+
+Sinks run in a thread pool, each reading from its own bounded queue. A sink that falls behind
+fills its queue and blocks the producer, rather than events being held in memory without limit.
+Sinks must consume every event, ignoring those they have no use for.
+"""
+import concurrent.futures
+import queue
+
+from bin import render
+
+# Number of events held for a sink before the producer waits for it
+SINK_QUEUE_SIZE = 1024
+# Seconds between checks that a sink blocking the producer is still running
+PUT_TIMEOUT = 0.1
+
+
+def start(sinks, queue_size=SINK_QUEUE_SIZE):
+    """Start each sink in its own thread, reading events from its own bounded queue.
+
+    Args:
+        sinks: List of sink functions, each taking an iterator of events.
+        queue_size: Number of events held for a sink before send waits for it
+            (Default value = SINK_QUEUE_SIZE).
+
+    Returns:
+        The running pipeline, for send and finish.
+
+    """
+    executor = concurrent.futures.ThreadPoolExecutor(
+        max_workers=max(1, len(sinks)), thread_name_prefix="pytmac-sink"
+    )
+    sink_queues = [queue.Queue(maxsize=queue_size) for _ in sinks]
+    sink_futures = [
+        executor.submit(sink, _queued_events(sink_queue))
+        for sink, sink_queue in zip(sinks, sink_queues)
+    ]
+
+    return {"executor": executor, "queues": sink_queues, "futures": sink_futures}
+
+
+def send(pipeline, event_type, payload):
+    """Send an event to every sink, waiting while any sink's queue is full.
+
+    The exception of a sink that failed is raised again, see _put.
+
+    Args:
+        pipeline: The pipeline from start.
+        event_type: The event type, see the module docstring.
+        payload: The event payload.
+
+    """
+    for sink_queue, sink_future in zip(pipeline["queues"], pipeline["futures"]):
+        _put(sink_queue, sink_future, (event_type, payload))
+
+
+def finish(pipeline):
+    """Signal the end of the events and wait for every sink to finish writing.
+
+    The exception of a sink that failed is raised again once every sink has stopped.
+
+    Args:
+        pipeline: The pipeline from start.
+
+    """
+    try:
+        for sink_queue, sink_future in zip(pipeline["queues"], pipeline["futures"]):
+            _put(sink_queue, sink_future, None)
+    finally:
+        pipeline["executor"].shutdown(wait=True)
+
+    for sink_future in pipeline["futures"]:
+        sink_future.result()
+
+
+def markdown(
+    events,
+    output_path,
+    config_yaml,
+    resources,
+    resource_index,
+    diagram_name,
+    plantuml_available,
+):
+    """Write the markdown report: intro, data flow diagram, findings and check statistics.
+
+    Args:
+        events: Iterator of events.
+        output_path: Path of the markdown report.
+        config_yaml: The config yaml file.
+        resources: The resource model from resource_model.build.
+        resource_index: The index from input_validator.index_resources.
+        diagram_name: Name of the diagram and its rendered image.
+        plantuml_available: Whether plantuml will render the diagram to an image.
+
+    """
+    with open(output_path, "w+", encoding="UTF-8") as output_file:
+        # Write intro into markdown
+        report_lines = ["# " + config_yaml["title"] + "\n"]
+        if type(config_yaml["description"]) == list:
+            for description_line in config_yaml["description"]:
+                report_lines.append(description_line + "\n")
+        else:
+            report_lines.append(config_yaml["description"])
+        report_lines.append("\n\n")
+        render.write_lines(output_file, report_lines)
+
+        # Write DFD of networks, their resources and links
+        render.write_lines(
+            output_file,
+            render.dfd_lines(
+                resources, resource_index, diagram_name, plantuml_available
+            ),
+        )
+
+        findings_count = 0
+        finding_rows = []
+        for event_type, payload in events:
+            if event_type == "finding":
+                if findings_count == 0:
+                    # Writing some auto threat modelling
+                    finding_rows.append(render.FINDINGS_HEADER)
+                findings_count += 1
+                finding_rows.append(render.finding_row(payload))
+                render.flush(output_file, finding_rows)
+            elif event_type == "check_stats":
+                render.flush(output_file, finding_rows, 0)
+                render.write_lines(output_file, render.check_stats_lines(payload))
+        render.flush(output_file, finding_rows, 0)
+
+
+def yaml_report(events, output_path):
+    """Write the YAML report of every resource.
+
+    Args:
+        events: Iterator of events.
+        output_path: Path of the report.
+
+    """
+    with open(output_path, "w", encoding="UTF-8") as output_report:
+        for event_type, payload in events:
+            if event_type == "report":
+                render.write_yaml_report(output_report, payload)
+
+
+def json_report(events, output_path):
+    """Write the JSON report of every resource.
+
+    Args:
+        events: Iterator of events.
+        output_path: Path of the report.
+
+    """
+    with open(output_path, "w", encoding="UTF-8") as output_report:
+        for event_type, payload in events:
+            if event_type == "report":
+                render.write_json_report(output_report, payload)
+
+
+def ndjson_report(events, output_path):
+    """Write the NDJSON report, a line for every resource followed by a line for every finding.
+
+    Args:
+        events: Iterator of events.
+        output_path: Path of the report.
+
+    """
+    with open(output_path, "w", encoding="UTF-8") as output_report:
+        report_lines = []
+        for event_type, payload in events:
+            if event_type == "report":
+                render.write_lines(output_report, render.ndjson_resource_lines(payload))
+            elif event_type == "finding":
+                report_lines.append(render.ndjson_finding_line(payload))
+                render.flush(output_report, report_lines)
+        render.flush(output_report, report_lines, 0)
+
+
+# Sink writing the machine-readable report in each of render.REPORT_FORMATS
+REPORT_SINKS = {
+    "yaml": yaml_report,
+    "json": json_report,
+    "ndjson": ndjson_report,
+}
+
+
+def _queued_events(sink_queue):
+    """Yield the events put on a sink's queue until the end of the events.
+
+    Args:
+        sink_queue: The sink's queue.
+
+    Yields:
+        (event_type, payload) events.
+
+    """
+    while True:
+        event = sink_queue.get()
+        if event is None:
+            return
+        yield event
+
+
+def _put(sink_queue, sink_future, event):
+    """Put an event on a sink's queue, waiting for space while the sink is running.
+
+    Events for a sink that has already returned are dropped, and the exception of a sink that
+    failed is raised again.
+
+    Args:
+        sink_queue: The sink's queue.
+        sink_future: The future of the running sink.
+        event: The event, or None for the end of the events.
+
+    """
+    while not sink_future.done():
+        try:
+            sink_queue.put(event, timeout=PUT_TIMEOUT)
+            return
+        except queue.Full:
+            continue
+
+    sink_future.result()
@@ -0,0 +1,247 @@
+"""On-disk cache of parsed input documents, reused across pytmac runs.
+
+Each input file has one entry, keyed by its absolute path and the parser used, holding the parsed
+document together with the size, modification time and content hash of the file it was parsed
+from. An unchanged size and modification time skips reading the file, an unchanged content hash
+skips parsing it. The cache holds at most max_bytes of entries, evicting the least recently used
+entries first.
+
+Entries are pickled, so the cache lives in the per-user cache directory rather than next to the
+inputs, and is only used while that directory is owned by the current user and private to them.
+"""
+import hashlib
+import logging
+import os
+import pickle
+import stat
+import time
+
+DEFAULT_CACHE_DIR = os.path.join(
+    os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"),
+    "pytmac",
+    "parsed",
+)
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+# Files modified this close to when their entry was written may change again without a visible
+# change in modification time, so their content hash is always checked
+RACY_SECONDS = 2
+
+_settings = {
+    "enabled": True,
+    "cache_dir": DEFAULT_CACHE_DIR,
+    "max_bytes": DEFAULT_MAX_BYTES,
+}
+
+
+def configure(enabled=True, cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+    """Set how parsed input documents are cached for the rest of the process.
+
+    Args:
+        enabled: Whether to use the cache (Default value = True).
+        cache_dir: Directory holding the cache (Default value = DEFAULT_CACHE_DIR).
+        max_bytes: Maximum total size of the cache entries (Default value = DEFAULT_MAX_BYTES).
+
+    """
+    _settings["enabled"] = enabled
+    _settings["cache_dir"] = cache_dir
+    _settings["max_bytes"] = max_bytes
+
+
+def parse(document_file, parser):
+    """Return the parsed contents of an open input file, using the cache when possible.
+
+    Args:
+        document_file: The input file, opened in text mode.
+        parser: Function taking the file contents as a string and returning the document.
+
+    Returns:
+        The parsed document.
+
+    """
+    if not _settings["enabled"] or not _private_cache_dir(_settings["cache_dir"]):
+        return parser(document_file.read())
+
+    file_stat = os.fstat(document_file.fileno())
+    entry_path = os.path.join(
+        _settings["cache_dir"],
+        _entry_name(os.path.abspath(document_file.name), parser),
+    )
+    entry = _read_entry(entry_path)
+
+    if (
+        entry is not None
+        and entry["size"] == file_stat.st_size
+        and entry["mtime_ns"] == file_stat.st_mtime_ns
+        and file_stat.st_mtime_ns < entry["written_ns"] - RACY_SECONDS * 10**9
+    ):
+        logging.debug("Using cached %s", document_file.name)
+        os.utime(entry_path)
+        return entry["document"]
+
+    contents = document_file.read()
+    content_hash = hashlib.blake2b(contents.encode("UTF-8"), digest_size=16).hexdigest()
+    if entry is not None and entry["content_hash"] == content_hash:
+        logging.debug("Using cached %s, contents unchanged", document_file.name)
+        document = entry["document"]
+    else:
+        document = parser(contents)
+
+    _write_entry(
+        entry_path,
+        {
+            "size": file_stat.st_size,
+            "mtime_ns": file_stat.st_mtime_ns,
+            "written_ns": time.time_ns(),
+            "content_hash": content_hash,
+            "document": document,
+        },
+    )
+
+    return document
+
+
+def clear(cache_dir=DEFAULT_CACHE_DIR):
+    """Remove every cached input document.
+
+    Args:
+        cache_dir: Directory holding the cache (Default value = DEFAULT_CACHE_DIR).
+
+    Returns:
+        True if the cache was removed
+
+    """
+    try:
+        entry_names = os.listdir(cache_dir)
+    except FileNotFoundError:
+        logging.info("No parsed input cache to clear in %s", cache_dir)
+        return True
+
+    for entry_name in entry_names:
+        os.remove(os.path.join(cache_dir, entry_name))
+    logging.info("Cleared parsed input cache in %s", cache_dir)
+
+    return True
+
+
+def _private_cache_dir(cache_dir):
+    """Create the cache directory if needed and check only the current user can access it.
+
+    Entries are unpickled when read, so a directory that other users can write to, or that is
+    owned by another user, is never used.
+
+    Args:
+        cache_dir: Directory holding the cache.
+
+    Returns:
+        True if the cache directory can be used.
+
+    """
+    if not hasattr(os, "getuid"):
+        return False
+
+    try:
+        os.makedirs(cache_dir, mode=0o700, exist_ok=True)
+        cache_dir_stat = os.lstat(cache_dir)
+    except OSError as error_message:
+        logging.warning("Unable to use parsed input cache: %s", error_message)
+        return False
+
+    if (
+        not stat.S_ISDIR(cache_dir_stat.st_mode)
+        or cache_dir_stat.st_uid != os.getuid()
+        or cache_dir_stat.st_mode & 0o077
+    ):
+        logging.warning(
+            "Not using parsed input cache %s, it must be a directory owned by and "
+            "private to the current user",
+            cache_dir,
+        )
+        return False
+
+    return True
+
+
+def _entry_name(file_path, parser):
+    """Return the name of the cache entry for a file and parser.
+
+    Args:
+        file_path: Absolute path of the input file.
+        parser: The parser function.
+
+    Returns:
+        File name of the cache entry.
+
+    """
+    return (
+        hashlib.blake2b(
+            (file_path + "\0" + parser.__module__ + "." + parser.__qualname__).encode(
+                "UTF-8"
+            ),
+            digest_size=16,
+        ).hexdigest()
+        + ".pickle"
+    )
+
+
+def _read_entry(entry_path):
+    """Read a cache entry, ignoring missing or unreadable entries.
+
+    Args:
+        entry_path: Path of the cache entry.
+
+    Returns:
+        The cache entry, or None.
+
+    """
+    try:
+        with open(entry_path, "rb") as entry_file:
+            return pickle.load(entry_file)
+    except FileNotFoundError:
+        return None
+    except (OSError, pickle.UnpicklingError, EOFError) as error_message:
+        logging.warning(
+            "Ignoring unreadable parsed input cache entry: %s", error_message
+        )
+        return None
+
+
+def _write_entry(entry_path, entry):
+    """Write a cache entry, evicting least recently used entries over the size limit.
+
+    Args:
+        entry_path: Path of the cache entry.
+        entry: The cache entry.
+
+    """
+    try:
+        # Write to a temporary file first so concurrent runs never read a partial entry
+        temporary_path = entry_path + "." + str(os.getpid()) + ".tmp"
+        with open(temporary_path, "wb") as entry_file:
+            pickle.dump(entry, entry_file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporary_path, entry_path)
+        _evict(_settings["cache_dir"], _settings["max_bytes"])
+    except OSError as error_message:
+        logging.warning("Unable to write parsed input cache entry: %s", error_message)
+
+
+def _evict(cache_dir, max_bytes):
+    """Remove the least recently used cache entries until the cache fits in max_bytes.
+
+    Args:
+        cache_dir: Directory holding the cache.
+        max_bytes: Maximum total size of the cache entries.
+
+    """
+    entries = []
+    for entry_name in os.listdir(cache_dir):
+        if entry_name.endswith(".pickle"):
+            entry_stat = os.stat(os.path.join(cache_dir, entry_name))
+            entries.append((entry_stat.st_mtime_ns, entry_stat.st_size, entry_name))
+
+    total_bytes = sum(entry[1] for entry in entries)
+    for _, entry_size, entry_name in sorted(entries):
+        if total_bytes <= max_bytes:
+            break
+        os.remove(os.path.join(cache_dir, entry_name))
+        total_bytes -= entry_size
+        logging.debug("Evicted parsed input cache entry %s", entry_name)
@@ -0,0 +1,330 @@
+"""Rendering of the markdown report, its PlantUML data flow diagram and the YAML report.
+
+Each element is rendered from a %-format template, which is cheaper than concatenating its
+parts, and lines are joined and written in blocks rather than one write per element. The
+machine-readable report is written one resource at a time rather than dumped as a single document.
+"""
+import itertools
+import json
+
+import yaml
+
+from bin import get_config
+
+# Number of rendered lines held in a buffer before it is written out
+BLOCK_LINES = 4096
+
+# Formats of the machine-readable report, the first is the default
+REPORT_FORMATS = ["yaml", "json", "ndjson"]
+
+# Values YAML loads that JSON has no type for, such as dates, are written as strings
+_json_encoder = json.JSONEncoder(separators=(",", ":"), sort_keys=True, default=str)
+
+HEADER_TEMPLATE = (
+    "# Data Flow Diagram\n"
+    "```plantuml\n"
+    "@startuml %s\n"
+    "!include https://raw.githubusercontent.com/"
+    "plantuml-stdlib/C4-PlantUML/master/C4_Container.puml\n"
+    "!include https://raw.githubusercontent.com/"
+    "geret1/plantuml-schemas/main/stride.puml\n"
+    "\n"
+)
+FOOTER_TEMPLATE = "@enduml\n```\n\n"
+DIAGRAM_TEMPLATE = "![Diagram](./%s.svg)"
+
+BOUNDARY_TEMPLATE = 'Boundary(b%s, "%s") {\n'
+PERSON_TEMPLATE = '\tPerson(%s, "%s", "%s")\n'
+SYSTEM_DB_TEMPLATE = '\tSystemDb(%s,"%s ", "%s")\n'
+SYSTEM_TEMPLATE = '\tSystem(%s,"%s ", "%s")\n'
+BI_REL_TEMPLATE = 'BiRel(%s,%s, "%s")\n'
+
+FINDINGS_HEADER = (
+    "\n\n"
+    "| Name | Resources | Finding | Remediation | Query | Severity |"
+    "\n|-----|-----|-----|-----|-----|-----|\n"
+)
+FINDING_ROW_TEMPLATE = "| %s | %s | %s | %s | %s | %s | \n"
+
+CHECK_STATS_HEADER = (
+    "\n\n# Appendix: Security check statistics\n"
+    "| Check | Seconds | Resources evaluated | Findings | Match rate |"
+    "\n|-----|-----|-----|-----|-----|\n"
+)
+CHECK_STATS_ROW_TEMPLATE = "| %s | %s | %s | %s | %s | \n"
+
+
+def dfd_lines(resources, resource_index, diagram_name, plantuml_available):
+    """Yield the markdown lines of the data flow diagram, from its header to the rendered image.
+
+    Args:
+        resources: The resource model from resource_model.build.
+        resource_index: The index from input_validator.index_resources.
+        diagram_name: Name of the diagram and its rendered image.
+        plantuml_available: Whether plantuml will render the diagram to an image.
+
+    Yields:
+        Rendered lines.
+
+    """
+    yield HEADER_TEMPLATE % diagram_name
+
+    no_resources = {"users": [], "databases": [], "systems": []}
+    for network in resources["networks"]:
+        network_name = network.name
+        yield BOUNDARY_TEMPLATE % (network_name, network_name)
+
+        network_resources = resource_index["network_resources"].get(
+            network_name, no_resources
+        )
+        for user in network_resources["users"]:
+            yield PERSON_TEMPLATE % (user.name, user.name, user.description)
+        for database in network_resources["databases"]:
+            yield SYSTEM_DB_TEMPLATE % (
+                database.name,
+                database.name,
+                database.description,
+            )
+        for system in network_resources["systems"]:
+            yield SYSTEM_TEMPLATE % (
+                system.name.replace("/", "_"),
+                system.name,
+                system.description,
+            )
+
+    for res_link in resources["res_links"]:
+        yield BI_REL_TEMPLATE % (
+            res_link.source.replace("/", "_"),
+            res_link.destination.replace("/", "_"),
+            res_link.description,
+        )
+
+    yield FOOTER_TEMPLATE
+    if plantuml_available:
+        yield DIAGRAM_TEMPLATE % diagram_name
+
+
+def finding_row(finding):
+    """Render a finding as a row of the findings table.
+
+    Args:
+        finding: An insecure resource from resource_validator.
+
+    Returns:
+        The rendered row.
+
+    """
+    return FINDING_ROW_TEMPLATE % (
+        finding["name"],
+        finding["resource"],
+        finding["description"],
+        finding["remediation"],
+        finding["check_query"],
+        finding["severity"],
+    )
+
+
+def check_stats_lines(check_stats):
+    """Yield the lines of the security check statistics appendix.
+
+    Args:
+        check_stats: Dictionary of security check to statistics, see resource_validator.run_check.
+
+    Yields:
+        Rendered lines.
+
+    """
+    yield CHECK_STATS_HEADER
+    for security_check, stats in check_stats.items():
+        yield CHECK_STATS_ROW_TEMPLATE % (
+            security_check,
+            format(stats["seconds"], ".6f"),
+            stats["resources_evaluated"],
+            stats["findings"],
+            format(stats["match_rate"], ".2%"),
+        )
+
+
+def flush(output_file, buffer, block_lines=BLOCK_LINES):
+    """Write and empty a buffer of rendered lines once it holds at least block_lines lines.
+
+    Args:
+        output_file: The file to write to.
+        buffer: List of rendered lines.
+        block_lines: Number of lines to hold before writing, 0 always writes
+            (Default value = BLOCK_LINES).
+
+    """
+    if buffer and len(buffer) >= block_lines:
+        output_file.write("".join(buffer))
+        buffer.clear()
+
+
+def write_lines(output_file, lines, block_lines=BLOCK_LINES):
+    """Write rendered lines to a file in blocks of block_lines lines.
+
+    Args:
+        output_file: The file to write to.
+        lines: Iterable of rendered lines.
+        block_lines: Number of lines written at once (Default value = BLOCK_LINES).
+
+    """
+    lines = iter(lines)
+    block = list(itertools.islice(lines, block_lines))
+    while block:
+        output_file.write("".join(block))
+        block = list(itertools.islice(lines, block_lines))
+
+
+def write_yaml_report(output_yaml, output_yaml_report):
+    """Write the report as YAML, one resource at a time.
+
+    The output matches yaml.dump of the whole report with keys sorted, but only one resource
+    configuration is copied and represented at a time, rather than the whole report.
+
+    Args:
+        output_yaml: The file to write to.
+        output_yaml_report: Dictionary of resource type to resource name to effective
+            configuration, from pytmac.build_report.
+
+    """
+    dumper = get_config.ReportDumper(output_yaml)
+    try:
+        dumper.open()
+        dumper.emit(yaml.DocumentStartEvent())
+        dumper.emit(yaml.MappingStartEvent(None, None, True, flow_style=False))
+        for resource_type in sorted(output_yaml_report):
+            _emit_node(dumper, dumper.represent_data(resource_type))
+            type_resources = output_yaml_report[resource_type]
+            dumper.emit(yaml.MappingStartEvent(None, None, True, flow_style=False))
+            for resource_name in sorted(type_resources):
+                _emit_node(dumper, dumper.represent_data(resource_name))
+                _emit_node(
+                    dumper, dumper.represent_data(dict(type_resources[resource_name]))
+                )
+                # Forget the represented configuration, it is not written again
+                dumper.represented_objects = {}
+                dumper.object_keeper = []
+            dumper.emit(yaml.MappingEndEvent())
+        dumper.emit(yaml.MappingEndEvent())
+        dumper.emit(yaml.DocumentEndEvent())
+        dumper.close()
+    finally:
+        dumper.dispose()
+
+
+def write_json_report(output_json, output_yaml_report):
+    """Write the report as compact JSON, one resource at a time.
+
+    Resource types, names and configuration settings are sorted, as in the YAML report.
+
+    Args:
+        output_json: The file to write to.
+        output_yaml_report: Dictionary of resource type to resource name to effective
+            configuration, from pytmac.build_report.
+
+    """
+    report_lines = ["{"]
+    for type_number, resource_type in enumerate(sorted(output_yaml_report)):
+        type_resources = output_yaml_report[resource_type]
+        report_lines.append(
+            ("," if type_number else "") + _json_encoder.encode(resource_type) + ":{"
+        )
+        for resource_number, resource_name in enumerate(sorted(type_resources)):
+            report_lines.append(
+                ("," if resource_number else "")
+                + _json_encoder.encode(resource_name)
+                + ":"
+                + _json_encoder.encode(dict(type_resources[resource_name]))
+            )
+            flush(output_json, report_lines)
+        report_lines.append("}")
+    report_lines.append("}\n")
+    flush(output_json, report_lines, 0)
+
+
+def ndjson_resource_lines(output_yaml_report):
+    """Yield a JSON line for every resource in the report, in the order of the YAML report.
+
+    Args:
+        output_yaml_report: Dictionary of resource type to resource name to effective
+            configuration, from pytmac.build_report.
+
+    Yields:
+        JSON lines with "record": "resource" and the resource_type, name and config.
+
+    """
+    for resource_type in sorted(output_yaml_report):
+        type_resources = output_yaml_report[resource_type]
+        for resource_name in sorted(type_resources):
+            yield _json_encoder.encode(
+                {
+                    "record": "resource",
+                    "resource_type": resource_type,
+                    "name": resource_name,
+                    "config": dict(type_resources[resource_name]),
+                }
+            ) + "\n"
+
+
+def ndjson_finding_line(finding):
+    """Render a finding as a JSON line.
+
+    Args:
+        finding: An insecure resource from resource_validator.
+
+    Returns:
+        The finding fields and "record": "finding" as a JSON line.
+
+    """
+    return _json_encoder.encode(dict(finding, record="finding")) + "\n"
+
+
+def _emit_node(dumper, node):
+    """Emit the events of a represented node, as the YAML serializer would.
+
+    Args:
+        dumper: The YAML dumper.
+        node: The represented node.
+
+    """
+    if isinstance(node, yaml.ScalarNode):
+        dumper.emit(
+            yaml.ScalarEvent(
+                None,
+                node.tag,
+                (
+                    node.tag
+                    == dumper.resolve(yaml.ScalarNode, node.value, (True, False)),
+                    node.tag
+                    == dumper.resolve(yaml.ScalarNode, node.value, (False, True)),
+                ),
+                node.value,
+                style=node.style,
+            )
+        )
+    elif isinstance(node, yaml.SequenceNode):
+        dumper.emit(
+            yaml.SequenceStartEvent(
+                None,
+                node.tag,
+                node.tag == dumper.resolve(yaml.SequenceNode, node.value, True),
+                flow_style=node.flow_style,
+            )
+        )
+        for item in node.value:
+            _emit_node(dumper, item)
+        dumper.emit(yaml.SequenceEndEvent())
+    else:
+        dumper.emit(
+            yaml.MappingStartEvent(
+                None,
+                node.tag,
+                node.tag == dumper.resolve(yaml.MappingNode, node.value, True),
+                flow_style=node.flow_style,
+            )
+        )
+        for key, value in node.value:
+            _emit_node(dumper, key)
+            _emit_node(dumper, value)
+        dumper.emit(yaml.MappingEndEvent())
@@ -0,0 +1,216 @@
+"""Typed model of the resources, built once the resources have been validated.
+
+Each resource is held in an object with __slots__ rather than the dictionary it was loaded as.
+Resource names, network names and configuration setting names are interned, so every resource
+referring to a network or overriding a setting shares one string rather than its own copy.
+Only the fields documented for each resource type are kept.
+"""
+import sys
+
+
+class _Resource:
+    """Base of the resource types, holding the fields named in FIELDS."""
+
+    __slots__ = ()
+    FIELDS = ()
+
+    @classmethod
+    def from_dict(cls, resource):
+        """Build a resource from its dictionary in the resources file.
+
+        Args:
+            resource: The resource dictionary.
+
+        Returns:
+            The resource.
+
+        """
+        return cls(**{field: resource.get(field) for field in cls.FIELDS})
+
+    def to_dict(self):
+        """Return the resource as a dictionary in the format of the resources file.
+
+        Fields that are not set are left out.
+
+        Returns:
+            The resource dictionary.
+
+        """
+        return {
+            field: getattr(self, field)
+            for field in self.FIELDS
+            if getattr(self, field) is not None
+        }
+
+    def __repr__(self):
+        return type(self).__name__ + "(" + repr(self.to_dict()) + ")"
+
+
+class Network(_Resource):
+    """A network, the boundary users, databases and systems are placed in."""
+
+    FIELDS = ("name", "description", "config")
+    __slots__ = FIELDS
+
+    def __init__(self, name, description=None, config=None):
+        """Create a network.
+
+        Args:
+            name: The network name.
+            description: The network description (Default value = None).
+            config: Configuration settings overriding the defaults (Default value = None).
+
+        """
+        self.name = _intern(name)
+        self.description = description
+        self.config = _intern_config(config)
+
+
+class _NetworkResource(_Resource):
+    """Base of the resource types placed in a network."""
+
+    FIELDS = ("name", "description", "network", "config")
+    __slots__ = FIELDS
+
+    def __init__(self, name, description=None, network=None, config=None):
+        """Create a resource placed in a network.
+
+        Args:
+            name: The resource name.
+            description: The resource description (Default value = None).
+            network: The name of the network the resource is placed in (Default value = None).
+            config: Configuration settings overriding the defaults (Default value = None).
+
+        """
+        self.name = _intern(name)
+        self.description = description
+        self.network = _intern(network)
+        self.config = _intern_config(config)
+
+
+class User(_NetworkResource):
+    """A user of the systems."""
+
+    __slots__ = ()
+
+
+class Database(_NetworkResource):
+    """A database."""
+
+    __slots__ = ()
+
+
+class System(_NetworkResource):
+    """A system, including endpoints added from the swagger file."""
+
+    __slots__ = ()
+
+
+class Link(_Resource):
+    """A link between two resources."""
+
+    FIELDS = ("source", "destination", "description")
+    __slots__ = FIELDS
+
+    def __init__(self, source, destination, description=None):
+        """Create a link.
+
+        Args:
+            source: The name of the resource the link starts from.
+            destination: The name of the resource the link ends at.
+            description: The link description (Default value = None).
+
+        """
+        self.source = _intern(source)
+        self.destination = _intern(destination)
+        self.description = description
+
+
+# Model type of each resource type in the resources file
+MODEL_TYPES = {
+    "networks": Network,
+    "users": User,
+    "databases": Database,
+    "systems": System,
+    "res_links": Link,
+}
+
+
+def build(resources, release=False):
+    """Build the model of validated resources.
+
+    Args:
+        resources: The resources, including swagger endpoints.
+        release: Remove each resource dictionary from resources once its model object is built,
+            so the loaded dictionaries and the model are not both held (Default value = False).
+
+    Returns:
+        Dictionary of resource type to list of resources, in the order of the resources file.
+
+    """
+    resource_model = {}
+    for resource_type, model_type in MODEL_TYPES.items():
+        type_resources = resources.get(resource_type) or []
+        if release:
+            # Pop from the end so each dictionary is freed as soon as it is converted
+            model_resources = []
+            while type_resources:
+                model_resources.append(model_type.from_dict(type_resources.pop()))
+            model_resources.reverse()
+        else:
+            model_resources = [
+                model_type.from_dict(resource) for resource in type_resources
+            ]
+        resource_model[resource_type] = model_resources
+
+    return resource_model
+
+
+def export(resource_model):
+    """Return the model as resources in the format of the resources file.
+
+    Args:
+        resource_model: The model from build.
+
+    Returns:
+        Dictionary of resource type to list of resource dictionaries.
+
+    """
+    return {
+        resource_type: [resource.to_dict() for resource in type_resources]
+        for resource_type, type_resources in resource_model.items()
+    }
+
+
+def _intern(value):
+    """Intern a string value, leaving other values unchanged.
+
+    Args:
+        value: The value.
+
+    Returns:
+        The interned string, or the value.
+
+    """
+    if isinstance(value, str):
+        return sys.intern(value)
+    return value
+
+
+def _intern_config(config):
+    """Intern the setting names of configuration settings, in place.
+
+    The loaded dictionary is reused rather than copied, keeping the order of its settings.
+
+    Args:
+        config: Dictionary of configuration settings, or None.
+
+    Returns:
+        config, with interned setting names.
+
+    """
+    if isinstance(config, dict):
+        interned_config = {_intern(setting): value for setting, value in config.items()}
+        config.clear()
+        config.update(interned_config)
+    return config
@@ -1,37 +1,529 @@
 """Module used to initiate and collate security findings from the json report generated."""
+import concurrent.futures
+import functools
+import json
 import logging
+import os
+import time
 
+from bin import bitset_engine, check_query
 
-def main(security_checks_yaml, output_json_report):
+CHECK_ENGINES = ["loop", "bitset"]
+CLAUSE_STATS_FILE = ".pytmac-clause-stats.json"
+
+# Run state of a worker process, set by _init_worker
+_worker_check_run = None
+
+
+def main(
+    security_checks_yaml,
+    output_json_report,
+    compiled_checks=None,
+    check_engine="loop",
+    workers=1,
+    check_stats=None,
+    clause_stats=None,
+):
     """Collect responses from required security scans and return.
 
     Args:
         security_checks_yaml: A json document containing all security checks to be run.
         output_json_report: A json document containing all resources and configuration settings
+        compiled_checks: Compiled check queries from compile_checks (Default value = None).
+        check_engine: The engine used to evaluate checks, one of CHECK_ENGINES (Default value = "loop").
+        workers: Number of worker processes to split the checks across (Default value = 1).
+        check_stats: Dictionary filled with the statistics of each check, see run_check
+            (Default value = None).
+        clause_stats: Clause statistics from load_clause_stats, used to order clauses and
+            updated with the clauses evaluated (Default value = None).
 
     Returns:
-        List of insecure resources.
+        List of insecure resources, ordered by severity.
 
     """
-    insecure_resources = []
+    insecure_resources = list(
+        iter_findings(
+            security_checks_yaml,
+            output_json_report,
+            compiled_checks,
+            check_engine,
+            workers,
+            check_stats,
+            clause_stats,
+        )
+    )
+
+    logging.info("Insecure resources found: %s", len(insecure_resources))
+
+    return insecure_resources
+
+
+def iter_findings(
+    security_checks_yaml,
+    output_json_report,
+    compiled_checks=None,
+    check_engine="loop",
+    workers=1,
+    check_stats=None,
+    clause_stats=None,
+):
+    """Yield insecure resources one at a time, ordered by severity.
+
+    Checks are bucketed by severity and evaluated bucket by bucket, so findings come out in
+    severity order without collecting and sorting every finding first.
+
+    Args:
+        security_checks_yaml: A json document containing all security checks to be run.
+        output_json_report: A json document containing all resources and configuration settings
+        compiled_checks: Compiled check queries from compile_checks (Default value = None).
+        check_engine: The engine used to evaluate checks, one of CHECK_ENGINES (Default value = "loop").
+        workers: Number of worker processes to split the checks across (Default value = 1).
+        check_stats: Dictionary filled with the statistics of each check, see run_check
+            (Default value = None).
+        clause_stats: Clause statistics from load_clause_stats, used to order clauses and
+            updated with the clauses evaluated (Default value = None).
+
+    Yields:
+        Insecure resources in the format returned by do_check.
+
+    """
+    logging.info("Prioritising security checks by severity")
+    ordered_checks = order_by_severity(security_checks_yaml)
+
+    if workers > 1:
+        logging.info("Running security checks across %s worker processes", workers)
+        # Workers compile the checks once at start-up, compiled checks are not picklable
+        with concurrent.futures.ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(
+                security_checks_yaml,
+                output_json_report,
+                check_engine,
+                clause_stats,
+            ),
+        ) as executor:
+            # map returns results in the order of the checks, matching the serial path
+            for security_check, worker_result in zip(
+                ordered_checks, executor.map(_run_worker_check, ordered_checks)
+            ):
+                if check_stats is not None:
+                    check_stats[security_check] = worker_result["check_stats"]
+                if clause_stats is not None:
+                    merge_clause_stats(clause_stats, worker_result["clause_counts"])
+                yield from worker_result["results"]
+    else:
+        if compiled_checks is None:
+            compiled_checks = compile_checks(
+                security_checks_yaml, clause_stats, clause_stats
+            )
+        check_run = new_check_run(
+            security_checks_yaml,
+            output_json_report,
+            compiled_checks,
+            check_engine,
+            check_stats,
+        )
+        for security_check in ordered_checks:
+            yield from run_check(check_run, security_check)
+
+
+def order_by_severity(security_checks_yaml):
+    """Order security checks by severity, keeping file order within a severity.
+
+    Args:
+        security_checks_yaml: A json document containing all security checks to be run.
+
+    Returns:
+        List of security check names.
 
+    """
+    severity_buckets = {}
     for security_check in security_checks_yaml:
+        severity_buckets.setdefault(
+            security_checks_yaml[security_check]["severity"], []
+        ).append(security_check)
+
+    ordered_checks = []
+    for severity in sorted(severity_buckets):
+        ordered_checks.extend(severity_buckets[severity])
+
+    return ordered_checks
+
+
+def new_check_run(
+    security_checks_yaml,
+    output_json_report,
+    compiled_checks,
+    check_engine="loop",
+    check_stats=None,
+):
+    """Create the state shared by all checks evaluated in a single run.
+
+    Args:
+        security_checks_yaml: A json document containing all security checks to be run.
+        output_json_report: A json document containing all resources and configuration settings
+        compiled_checks: Compiled check queries from compile_checks.
+        check_engine: The engine used to evaluate checks, one of CHECK_ENGINES (Default value = "loop").
+        check_stats: Dictionary filled with the statistics of each check, see run_check
+            (Default value = None).
+
+    Returns:
+        Dictionary holding the checks, report and caches for the run.
+
+    """
+    return {
+        "security_checks_yaml": security_checks_yaml,
+        "output_json_report": output_json_report,
+        "compiled_checks": compiled_checks,
+        "check_engine": check_engine,
+        "bitset_index_cache": {},
+        # Resources per distinct resource_scope, built once for this run
+        "scope_index": {},
+        "check_stats": {} if check_stats is None else check_stats,
+    }
+
+
+def run_check(check_run, security_check):
+    """Evaluate a single security check as part of a run.
+
+    The statistics of the check are recorded in the check_stats of the run as:
+
+    {
+        "seconds": [Wall time spent evaluating the check],
+        "resources_evaluated": [Number of resources in the resource_scope],
+        "findings": [Number of insecure resources found],
+        "match_rate": [Fraction of the evaluated resources that were insecure]
+    }
+
+    The statistics are recorded once the check is exhausted. Time spent by the caller between
+    findings is not counted in the seconds of the check.
+
+    Args:
+        check_run: The run state from new_check_run.
+        security_check: The name of the security check to evaluate.
+
+    Yields:
+        Insecure resources for the check, as they are found.
+
+    """
+    logging.info("Starting security check %s", security_check)
+    check_seconds = 0.0
+    findings = 0
+    start_time = time.perf_counter()
+    for insecure_resource in iter_check(check_run, security_check):
+        check_seconds += time.perf_counter() - start_time
+        findings += 1
+        yield insecure_resource
+        start_time = time.perf_counter()
+    check_seconds += time.perf_counter() - start_time
+
+    resources_evaluated = len(
+        scope_resources(
+            check_run["output_json_report"],
+            check_run["security_checks_yaml"][security_check]["resource_scope"],
+            check_run["scope_index"],
+        )
+    )
+    check_run["check_stats"][security_check] = {
+        "seconds": check_seconds,
+        "resources_evaluated": resources_evaluated,
+        "findings": findings,
+        "match_rate": findings / resources_evaluated if resources_evaluated else 0,
+    }
+
+    if findings > 0:
+        logging.info("Results found for security check %s", security_check)
+    logging.info("Finished security check %s", security_check)
+
+
+def iter_check(check_run, security_check):
+    """Yield the insecure resources for a single security check as part of a run.
+
+    Args:
+        check_run: The run state from new_check_run.
+        security_check: The name of the security check to evaluate.
+
+    Yields:
+        Insecure resources in the format returned by do_check.
+
+    """
+    check_details = check_run["security_checks_yaml"][security_check]
+    if check_run["check_engine"] == "bitset":
+        results = bitset_engine.do_check(
+            check_details,
+            bitset_engine.compile_check(check_details["check_query"]),
+            scope_resources(
+                check_run["output_json_report"],
+                check_details["resource_scope"],
+                check_run["scope_index"],
+            ),
+            check_run["bitset_index_cache"],
+        )
+        if results is not None:
+            yield from results
+            return
+        logging.info(
+            "Check %s not supported by bitset engine, using loop engine",
+            security_check,
+        )
+
+    yield from iter_insecure_resources(
+        check_run["output_json_report"],
+        check_details,
+        check_run["compiled_checks"][security_check],
+        check_run["scope_index"],
+    )
+
+
+def first_finding(
+    security_checks_yaml,
+    output_json_report,
+    max_severity,
+    compiled_checks=None,
+    check_engine="loop",
+):
+    """Return the first insecure resource found with a severity at or below max_severity.
+
+    Checks are evaluated in severity order and evaluation stops at the first finding.
+
+    Args:
+        security_checks_yaml: A json document containing all security checks to be run.
+        output_json_report: A json document containing all resources and configuration settings
+        max_severity: The highest severity number of the checks to run.
+        compiled_checks: Compiled check queries from compile_checks (Default value = None).
+        check_engine: The engine used to evaluate checks, one of CHECK_ENGINES (Default value = "loop").
+
+    Returns:
+        The first insecure resource found, or None.
+
+    """
+    gate_checks = {
+        security_check: check_details
+        for security_check, check_details in security_checks_yaml.items()
+        if check_details["severity"] <= max_severity
+    }
+    if compiled_checks is None:
+        compiled_checks = compile_checks(gate_checks)
+    check_run = new_check_run(
+        gate_checks, output_json_report, compiled_checks, check_engine
+    )
+
+    for security_check in order_by_severity(gate_checks):
         logging.info("Starting security check %s", security_check)
-        results = do_check(output_json_report, security_checks_yaml[security_check])
-        if len(results) > 0:
-            logging.info("Results found! Appending to insecure_resources")
-            for result in results:
-                insecure_resources.append(result)
-        logging.info("Finished security check %s", security_check)
-    logging.info("Prioritising insecure resources")
-    insecure_resources.sort(key=lambda k: k["severity"])
+        for insecure_resource in iter_check(check_run, security_check):
+            logging.info(
+                "Found %s on %s, stopping",
+                insecure_resource["name"],
+                insecure_resource["resource"],
+            )
+            return insecure_resource
 
-    logging.info("Insecure resources: %s", str(insecure_resources))
+    return None
 
-    return insecure_resources
 
+def _init_worker(
+    security_checks_yaml,
+    output_json_report,
+    check_engine,
+    clause_stats,
+):
+    """Compile the security checks once when a worker process starts.
+
+    Args:
+        security_checks_yaml: A json document containing all security checks to be run.
+        output_json_report: A json document containing all resources and configuration settings
+        check_engine: The engine used to evaluate checks, one of CHECK_ENGINES.
+        clause_stats: Clause statistics from load_clause_stats, or None.
+
+    """
+    global _worker_check_run  # pylint: disable=global-statement
+    # Clauses evaluated by this worker, returned to the parent after each check
+    clause_counts = None if clause_stats is None else {}
+    _worker_check_run = new_check_run(
+        security_checks_yaml,
+        output_json_report,
+        compile_checks(security_checks_yaml, clause_stats, clause_counts),
+        check_engine,
+    )
+    _worker_check_run["clause_counts"] = clause_counts
+
+
+def _run_worker_check(security_check):
+    """Evaluate a single security check in a worker process.
+
+    Args:
+        security_check: The name of the security check to evaluate.
+
+    Returns:
+        Dictionary of the insecure resources, statistics and clause counts for the check.
+
+    """
+    results = list(run_check(_worker_check_run, security_check))
+
+    clause_counts = {}
+    if _worker_check_run["clause_counts"] is not None:
+        # The compiled clauses hold on to their count lists, so reset them in place
+        for key, counts in _worker_check_run["clause_counts"].items():
+            if counts[1]:
+                clause_counts[key] = counts[:]
+                counts[0] = counts[1] = 0
+
+    return {
+        "results": results,
+        "check_stats": _worker_check_run["check_stats"][security_check],
+        "clause_counts": clause_counts,
+    }
+
+
+def compile_checks(security_checks_yaml, clause_stats=None, clause_counts=None):
+    """Compile the check_query of every security check once, ahead of evaluation.
+
+    When clause statistics from earlier runs are provided, and/or operands are ordered so the
+    operand most likely to decide the result runs first.
+
+    Args:
+        security_checks_yaml: A json document containing all security checks to be run.
+        clause_stats: Clause statistics from load_clause_stats (Default value = None).
+        clause_counts: Dictionary of clause key to [times true, times evaluated], updated as
+            clauses are evaluated (Default value = None).
+
+    Returns:
+        Dictionary of check name to compiled check query.
+
+    Raises:
+        SyntaxError: If a check_query cannot be compiled, naming the failing check.
+
+    """
+    compiled_checks = {}
+    for security_check in security_checks_yaml:
+        try:
+            compiled_checks[security_check] = check_query.compile_query(
+                security_checks_yaml[security_check]["check_query"],
+                clause_stats,
+                clause_counts,
+            )
+        except SyntaxError as error_message:
+            raise SyntaxError(
+                "Failed to compile security check "
+                + security_check
+                + ": "
+                + str(error_message)
+            ) from error_message
+
+    logging.info("Compiled %s security checks", len(compiled_checks))
+
+    return compiled_checks
+
+
+def load_clause_stats(stats_dir):
+    """Load the clause statistics recorded by earlier runs.
+
+    A missing or unreadable statistics file results in empty statistics.
+
+    Args:
+        stats_dir: Directory holding the statistics file.
+
+    Returns:
+        Dictionary of clause key to [times true, times evaluated].
+
+    """
+    try:
+        with open(
+            os.path.join(stats_dir, CLAUSE_STATS_FILE), "r", encoding="UTF-8"
+        ) as stats_file:
+            return json.load(stats_file)["clauses"]
+    except FileNotFoundError:
+        logging.info("No clause statistics found in %s", stats_dir)
+    except (OSError, ValueError, KeyError) as error_message:
+        logging.warning("Ignoring unreadable clause statistics: %s", error_message)
+
+    return {}
 
-def do_check(output_json_report, check_details):
+
+def save_clause_stats(stats_dir, clause_stats):
+    """Write the clause statistics so later runs can order clauses by selectivity.
+
+    Args:
+        stats_dir: Directory holding the statistics file.
+        clause_stats: Dictionary of clause key to [times true, times evaluated].
+
+    Returns:
+        True if the statistics were written
+
+    """
+    stats_path = os.path.join(stats_dir, CLAUSE_STATS_FILE)
+    # Write to a temporary file first so an interrupted run cannot corrupt the statistics
+    with open(stats_path + ".tmp", "w", encoding="UTF-8") as stats_file:
+        json.dump(
+            {
+                "clauses": {
+                    key: counts for key, counts in clause_stats.items() if counts[1]
+                }
+            },
+            stats_file,
+            indent=2,
+            sort_keys=True,
+        )
+    os.replace(stats_path + ".tmp", stats_path)
+
+    logging.info("Clause statistics written for %s clauses", len(clause_stats))
+
+    return True
+
+
+def merge_clause_stats(clause_stats, clause_counts):
+    """Add clause counts recorded elsewhere (for example in a worker process) to the statistics.
+
+    Args:
+        clause_stats: Dictionary of clause key to [times true, times evaluated].
+        clause_counts: Dictionary of clause key to [times true, times evaluated] to add.
+
+    """
+    for key, counts in clause_counts.items():
+        stats = clause_stats.setdefault(key, [0, 0])
+        stats[0] += counts[0]
+        stats[1] += counts[1]
+
+
+def compile_query(query):
+    """Compile a check_query (a string or list of string fragments) into a predicate.
+
+    Identical queries are only compiled once per process.
+
+    Args:
+        query: The check_query value from a security check.
+
+    Returns:
+        Function taking a resource configuration and returning True for an insecure resource.
+
+    """
+    if isinstance(query, list):
+        query = "".join(query)
+
+    return _compile_query_source(query)
+
+
+@functools.lru_cache(maxsize=None)
+def _compile_query_source(query_source):
+    """Compile and cache the joined source of a check_query.
+
+    Args:
+        query_source: The joined check_query source.
+
+    Returns:
+        Function taking a resource configuration and returning True for an insecure resource.
+
+    """
+    return check_query.compile_query(query_source)
+
+
+def do_check(
+    output_json_report,
+    check_details,
+    compiled_query=None,
+    scope_index=None,
+):
     """Look up a check type in security_checks.json and checks resources using a given function.
 
     Insecure resources are returned in the format:
@@ -48,19 +540,51 @@ def do_check(output_json_report, check_details):
     Args:
         output_json_report: The json report of resources and configuration
         check_details: A json containing the details for the check to run.
+        compiled_query: The compiled check_query from compile_checks (Default value = None).
+        scope_index: Dictionary of resource_scope to resources, shared across checks in the same
+            run (Default value = None).
 
     Returns:
         list(dict)
 
     """
-    resources = {}
-    for resource_scope in check_details["resource_scope"]:
-        resources = resources | output_json_report[resource_scope]
-    insecure_resources = []
+    return list(
+        iter_insecure_resources(
+            output_json_report,
+            check_details,
+            compiled_query,
+            scope_index,
+        )
+    )
+
 
-    for resource in resources:
-        if eval("".join(check_details["check_query"])):  # pylint: disable=eval-used
-            example_resource = {
+def iter_insecure_resources(
+    output_json_report,
+    check_details,
+    compiled_query=None,
+    scope_index=None,
+):
+    """Yield the insecure resources for a check one at a time, in the format of do_check.
+
+    Args:
+        output_json_report: The json report of resources and configuration
+        check_details: A json containing the details for the check to run.
+        compiled_query: The compiled check_query from compile_checks (Default value = None).
+        scope_index: Dictionary of resource_scope to resources, shared across checks in the same
+            run (Default value = None).
+
+    Yields:
+        dict
+
+    """
+    if compiled_query is None:
+        compiled_query = compile_query(check_details["check_query"])
+
+    for resource, resource_config in scope_resources(
+        output_json_report, check_details["resource_scope"], scope_index
+    ):
+        if compiled_query(resource_config):
+            yield {
                 "name": check_details["name"],
                 "resource": resource,
                 "description": check_details["description"],
@@ -68,6 +592,34 @@ def do_check(output_json_report, check_details):
                 "remediation": check_details["remediation"],
                 "severity": check_details["severity"],
             }
-            insecure_resources.append(example_resource)
 
-    return insecure_resources
+
+def scope_resources(output_json_report, resource_scope, scope_index=None):
+    """Return the resources covered by a resource_scope as (name, config) pairs.
+
+    Each distinct resource_scope combination is built once and shared through the scope index.
+    Resources of different types with the same name are all kept.
+
+    Args:
+        output_json_report: The json report of resources and configuration
+        resource_scope: List of resource types covered by a check.
+        scope_index: Dictionary of resource_scope to resources, shared across checks in the same
+            run (Default value = None).
+
+    Returns:
+        Tuple of (resource name, resource config) pairs.
+
+    """
+    scope_key = tuple(resource_scope)
+    if scope_index is not None and scope_key in scope_index:
+        return scope_index[scope_key]
+
+    resources = tuple(
+        resource
+        for resource_type in scope_key
+        for resource in output_json_report[resource_type].items()
+    )
+    if scope_index is not None:
+        scope_index[scope_key] = resources
+
+    return resources
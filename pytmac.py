@@ -2,22 +2,36 @@
 
 """Python based programmatic threat modelling tool tmacs."""
 import argparse
+import concurrent.futures
+import functools
 import json
 import logging
 import os
 import subprocess
 import sys
-from copy import deepcopy
+from collections import ChainMap
 from datetime import date
 
 import inquirer
 import yaml
 
 from _version import __version__
-from bin import get_config, init, input_validator, resource_validator
+from bin import (
+    get_config,
+    init,
+    input_validator,
+    output_sinks,
+    parse_cache,
+    render,
+    resource_model,
+    resource_validator,
+)
 
 VERSION = __version__
 
+# Batch run state of a worker process, set by _init_batch_worker
+_batch_worker_state = None
+
 # Configure logging
 logging.basicConfig(
     format=(
@@ -55,7 +69,7 @@ parser.add_argument(
     "--resources-file",
     action="store",
     default="None",
-    help="The path to the resources file",
+    help="The path to the resources file, or a directory or glob of resources files",
 )
 parser.add_argument(
     "--config-file",
@@ -81,6 +95,77 @@ parser.add_argument(
     default="None",
     help="[Default: None] The path to the swagger file (optional)",
 )
+parser.add_argument(
+    "--check-engine",
+    action="store",
+    default="loop",
+    choices=resource_validator.CHECK_ENGINES,
+    help="[Default: loop] The engine used to evaluate security checks",
+)
+parser.add_argument(
+    "--workers",
+    action="store",
+    default=1,
+    type=int,
+    help="[Default: 1] Number of worker processes used to evaluate security checks",
+)
+parser.add_argument(
+    "--clear-cache",
+    action="store_true",
+    help="Clear the parsed input cache before running",
+)
+parser.add_argument(
+    "--no-input-cache",
+    action="store_true",
+    help="Disable the cache of parsed input files",
+)
+parser.add_argument(
+    "--fail-on-severity",
+    action="store",
+    default=None,
+    type=int,
+    help="Exit with an error if any finding has this severity number or lower",
+)
+parser.add_argument(
+    "--gate-only",
+    action="store_true",
+    help="Only check --fail-on-severity and exit, without writing reports or diagrams",
+)
+parser.add_argument(
+    "--profile-checks",
+    action="store_true",
+    help="Write per-check timing and hit-rate statistics to a json file alongside the report",
+)
+parser.add_argument(
+    "--profile-checks-markdown",
+    action="store_true",
+    help="Also add the per-check statistics to the markdown report as an appendix",
+)
+parser.add_argument(
+    "--adaptive-check-order",
+    action="store_true",
+    help="Order check clauses by how often they matched in earlier runs in the output directory",
+)
+parser.add_argument(
+    "--report-format",
+    action="store",
+    default="yaml",
+    choices=render.REPORT_FORMATS,
+    help="[Default: yaml] Format of the machine-readable report of resources and findings",
+)
+parser.add_argument(
+    "--batch",
+    action="store",
+    default="None",
+    help="Generate a report for every model listed in a batch manifest file",
+)
+parser.add_argument(
+    "--batch-workers",
+    action="store",
+    default=1,
+    type=int,
+    help="[Default: 1] Number of worker processes used to generate batch reports",
+)
 parser.add_argument(
     "--init",
     action="store_true",
@@ -90,26 +175,27 @@ parser.add_argument(
 args = parser.parse_args()
 
 
-def main(
+def validate_inputs(
     resources_yaml,
     config_yaml,
     defaults_yaml,
     security_checks_yaml,
-    output_dir,
-    swagger_json="",
+    swagger_json,
+    compiled_checks=None,
 ):
-    """Primary function used to open up provided config and resource files, generating DFD and output.
+    """Validate the provided input files and compile the security checks, exiting on failure.
 
     Args:
         resources_yaml: The resources yaml file.
         config_yaml: The config yaml file.
         defaults_yaml: The defaults yaml file.
         security_checks_yaml: The security checks yaml file.
-        output_dir: The output directory.
-        swagger_json: The swagger json file (Default value = "").
+        swagger_json: The swagger json file, or "None".
+        compiled_checks: Security checks already compiled, skipping compilation
+            (Default value = None).
 
     Returns:
-        bool: The return value. True for success, False otherwise.
+        Compiled security checks.
 
     """
     # Validate configuration
@@ -133,11 +219,48 @@ def main(
             logging.error("Swagger validation failed!")
             sys.exit(1)
 
-    # Validate output directory exists
-    if not os.path.exists(output_dir):
-        logging.error("Output directory (%s) does not exist!", output_dir)
+    if compiled_checks is not None:
+        return compiled_checks
+
+    # Compile security checks
+    try:
+        compiled_checks = resource_validator.compile_checks(security_checks_yaml)
+    except SyntaxError as error_message:
+        logging.error(str(error_message))
         sys.exit(1)
 
+    return compiled_checks
+
+
+def probe_plantuml():
+    """Check whether the plantuml executable is available.
+
+    Returns:
+        True if plantuml can be called.
+
+    """
+    try:
+        # Check if plantuml executable is available
+        subprocess.run(["plantuml", "-version"], stdout=subprocess.DEVNULL)
+        logging.info("Plantuml executable found, will generate diagrams")
+        return True
+    except FileNotFoundError:
+        logging.error("Plantuml executable not found, unable to generate diagram")
+        return False
+
+
+def add_swagger_resources(resources_yaml, config_yaml, swagger_json):
+    """Add swagger endpoints to the resources as swagger_resource_type resources.
+
+    Args:
+        resources_yaml: The resources yaml file.
+        config_yaml: The config yaml file.
+        swagger_json: The swagger json file, or "None".
+
+    Returns:
+        The resources, including swagger endpoints.
+
+    """
     resources = resources_yaml["resources"]
     # Load swagger if enabled
     if swagger_json != "None":
@@ -177,252 +300,480 @@ def main(
                         config_yaml["swagger_resource_type"]
                     ].append(swagger_path_detail)
 
+    return resources
+
+
+def build_report(resources, defaults_yaml, resource_index=None):
+    """Build the effective configuration of every resource from defaults and resource overrides.
+
+    Only resources in a defined network are included.
+
+    Args:
+        resources: The resource model from resource_model.build.
+        defaults_yaml: The defaults yaml file.
+        resource_index: The index from input_validator.index_resources, built when not provided
+            (Default value = None).
+
+    Returns:
+        Dictionary of resource type to resource name to effective configuration.
+
+    """
+    output_yaml_report = {
+        "networks": {},
+        "databases": {},
+        "users": {},
+        "systems": {},
+    }
+    if resource_index is None:
+        resource_index = input_validator.index_resources(resources)
+
+    for network in resources["networks"]:
+        output_yaml_report["networks"][network.name] = effective_config(
+            network, defaults_yaml["networks"]
+        )
+        network_resources = resource_index["network_resources"].get(network.name, {})
+        for resource_type in ["users", "databases", "systems"]:
+            for resource in network_resources.get(resource_type, []):
+                output_yaml_report[resource_type][resource.name] = effective_config(
+                    resource, defaults_yaml[resource_type]
+                )
+
+    return output_yaml_report
+
+
+def effective_config(resource, resource_defaults):
+    """Return the configuration of a resource, layering its overrides over the defaults.
+
+    Neither the defaults nor the overrides of the resource model are copied, so the returned
+    configuration must be treated as read-only.
+
+    Args:
+        resource: The resource from the resource model.
+        resource_defaults: The defaults for the resource type.
+
+    Returns:
+        ChainMap of the resource overrides and the defaults.
+
+    """
+    # Look for override config
+    logging.info("Overrides set for %s", resource.name)
+    if resource.config is None:
+        # No overrides set, nothing to do
+        logging.info("No overrides for %s", resource.name)
+        return ChainMap({}, resource_defaults)
+
+    for config_setting in resource.config:
+        logging.info("Setting " + config_setting + " on " + resource.name)
+
+    return ChainMap(resource.config, resource_defaults)
+
+
+def gate(
+    resources_yaml,
+    config_yaml,
+    defaults_yaml,
+    security_checks_yaml,
+    fail_on_severity,
+    swagger_json="None",
+    check_engine="loop",
+    release_resources=False,
+):
+    """Look for any finding at or below a severity, without writing reports or diagrams.
+
+    Checks are evaluated in severity order and evaluation stops at the first qualifying finding.
+
+    Args:
+        resources_yaml: The resources yaml file.
+        config_yaml: The config yaml file.
+        defaults_yaml: The defaults yaml file.
+        security_checks_yaml: The security checks yaml file.
+        fail_on_severity: Findings with this severity number or lower fail the gate.
+        swagger_json: The swagger json file (Default value = "None").
+        check_engine: The engine used to evaluate security checks (Default value = "loop").
+        release_resources: Empty the lists of resources_yaml while building the resource model,
+            for callers that do not use it afterwards (Default value = False).
+
+    Returns:
+        The first qualifying finding, or None if there is none.
+
+    """
+    compiled_checks = validate_inputs(
+        resources_yaml,
+        config_yaml,
+        defaults_yaml,
+        security_checks_yaml,
+        swagger_json,
+    )
+    resources = resource_model.build(
+        add_swagger_resources(resources_yaml, config_yaml, swagger_json),
+        release_resources,
+    )
+
+    return resource_validator.first_finding(
+        security_checks_yaml,
+        build_report(resources, defaults_yaml),
+        fail_on_severity,
+        compiled_checks,
+        check_engine,
+    )
+
+
+def main(
+    resources_yaml,
+    config_yaml,
+    defaults_yaml,
+    security_checks_yaml,
+    output_dir,
+    swagger_json="",
+    check_engine="loop",
+    workers=1,
+    fail_on_severity=None,
+    profile_checks=False,
+    profile_checks_markdown=False,
+    adaptive_check_order=False,
+    compiled_checks=None,
+    plantuml_available=None,
+    report_format="yaml",
+    release_resources=False,
+):
+    """Primary function used to open up provided config and resource files, generating DFD and output.
+
+    Args:
+        resources_yaml: The resources yaml file.
+        config_yaml: The config yaml file.
+        defaults_yaml: The defaults yaml file.
+        security_checks_yaml: The security checks yaml file.
+        output_dir: The output directory.
+        swagger_json: The swagger json file (Default value = "").
+        check_engine: The engine used to evaluate security checks (Default value = "loop").
+        workers: Number of worker processes used to evaluate security checks (Default value = 1).
+        fail_on_severity: Findings with this severity number or lower fail the run (Default value = None).
+        profile_checks: Write per-check statistics to a json file (Default value = False).
+        profile_checks_markdown: Add per-check statistics to the markdown report
+            (Default value = False).
+        adaptive_check_order: Order check clauses using statistics kept in the output directory
+            (Default value = False).
+        compiled_checks: Security checks already compiled, for example by batch
+            (Default value = None).
+        plantuml_available: Whether plantuml is available, probed when not provided
+            (Default value = None).
+        report_format: Format of the machine-readable report, one of render.REPORT_FORMATS
+            (Default value = "yaml").
+        release_resources: Empty the lists of resources_yaml while building the resource model,
+            for callers that do not use it afterwards (Default value = False).
+
+    Returns:
+        bool: The return value. True for success, False otherwise.
+
+    """
+    compiled_checks = validate_inputs(
+        resources_yaml,
+        config_yaml,
+        defaults_yaml,
+        security_checks_yaml,
+        swagger_json,
+        compiled_checks,
+    )
+
+    # Validate output directory exists
+    if not os.path.exists(output_dir):
+        logging.error("Output directory (%s) does not exist!", output_dir)
+        sys.exit(1)
+
+    clause_stats = None
+    if adaptive_check_order:
+        clause_stats = resource_validator.load_clause_stats(output_dir)
+        compiled_checks = resource_validator.compile_checks(
+            security_checks_yaml, clause_stats, clause_stats
+        )
+
+    # The loaded dictionaries are only released when the caller does not hold on to them
+    resources = resource_model.build(
+        add_swagger_resources(resources_yaml, config_yaml, swagger_json),
+        release_resources,
+    )
+    resource_index = input_validator.index_resources(resources)
+    if not input_validator.references(resources, resource_index):
+        logging.warning("Resources reference unknown names, see warnings above")
+    output_yaml_report = build_report(resources, defaults_yaml, resource_index)
+
     # Check if plantuml is callable
-    try:
-        # Check if plantuml executable is available
-        subprocess.run(["plantuml", "-version"], stdout=subprocess.DEVNULL)
-        logging.info("Plantuml executable found, will generate diagrams")
-        plantuml_available = True
-    except FileNotFoundError:
-        plantuml_available = False
-        logging.error("Plantuml executable not found, unable to generate diagram")
+    if plantuml_available is None:
+        plantuml_available = probe_plantuml()
 
     output_file_dir = output_dir
     output_file_name = "report-" + str(date.today())
 
-    with open(
-        output_file_dir + "/" + output_file_name + ".md", "w+", encoding="UTF-8"
-    ) as output_file:
-        # Build out json report
-        with open(
-            output_file_dir + "/" + output_file_name + ".yaml", "w", encoding="UTF-8"
-        ) as output_yaml:
-            # Start empty json for output report
-            output_yaml_report = {}
-            # Write intro into markdown
-            output_file.write("# " + config_yaml["title"] + "\n")
-            if type(config_yaml["description"]) == list:
-                for description_line in config_yaml["description"]:
-                    output_file.write(description_line + "\n")
-            else:
-                output_file.write(config_yaml["description"])
-            output_file.write("\n\n")
-
-            # Write wrapper for DFD
-            output_file.write("# Data Flow Diagram\n")
-            output_file.write("```plantuml\n")
-            output_file.write("@startuml " + output_file_name + "\n")
-            output_file.write(
-                "!include https://raw.githubusercontent.com/"
-                "plantuml-stdlib/C4-PlantUML/master/C4_Container.puml\n"
-            )
-            output_file.write(
-                "!include https://raw.githubusercontent.com/"
-                "geret1/plantuml-schemas/main/stride.puml\n"
-            )
-            output_file.write("\n")
-
-            # Write networks wrapper
-            output_yaml_report["networks"] = {}
-            output_yaml_report["databases"] = {}
-            output_yaml_report["users"] = {}
-            output_yaml_report["systems"] = {}
-            # Process network resources as top wrapper
-            for network in resources["networks"]:
-                # Build out network config in output
-                output_yaml_report["networks"][network["name"]] = deepcopy(
-                    defaults_yaml["networks"]
-                )
+    # Markdown and machine-readable reports are written concurrently from the same results,
+    # the machine-readable report reads the effective configurations the checks read
+    pipeline = output_sinks.start(
+        [
+            functools.partial(
+                output_sinks.markdown,
+                output_path=output_file_dir + "/" + output_file_name + ".md",
+                config_yaml=config_yaml,
+                resources=resources,
+                resource_index=resource_index,
+                diagram_name=output_file_name,
+                plantuml_available=plantuml_available,
+            ),
+            functools.partial(
+                output_sinks.REPORT_SINKS[report_format],
+                output_path=output_file_dir
+                + "/"
+                + output_file_name
+                + "."
+                + report_format,
+            ),
+        ]
+    )
+    try:
+        output_sinks.send(pipeline, "report", output_yaml_report)
 
-                # Look for override config for network
-                try:
-                    logging.info("Overrides set for %s", network["name"])
-                    for config_setting in network["config"]:
-                        logging.info(
-                            "Setting " + config_setting + " on " + network["name"]
-                        )
-                        output_yaml_report["networks"][network["name"]][
-                            config_setting
-                        ] = network["config"][config_setting]
-                except KeyError:
-                    logging.info("No overrides set, nothing to do")
-                # Write network to mermaid
-                output_file.write(
-                    "Boundary(b"
-                    + network["name"]
-                    + ', "'
-                    + network["name"]
-                    + '") {'
-                    + "\n"
-                )
+        # Insecure resources
+        check_stats = {}
+        insecure_resources = resource_validator.iter_findings(
+            security_checks_yaml,
+            output_yaml_report,
+            compiled_checks,
+            check_engine,
+            workers,
+            check_stats,
+            clause_stats,
+        )
+        findings_count = 0
+        gate_failed = False
+        for response in insecure_resources:
+            findings_count += 1
+            if (
+                fail_on_severity is not None
+                and response["severity"] <= fail_on_severity
+            ):
+                gate_failed = True
+            output_sinks.send(pipeline, "finding", response)
+        logging.info("Insecure resources found: %s", findings_count)
+        if clause_stats is not None:
+            resource_validator.save_clause_stats(output_dir, clause_stats)
 
-                # Look for users in network
-                for user in resources["users"]:
-                    if user["network"] == network["name"]:
-                        output_yaml_report["users"][user["name"]] = deepcopy(
-                            defaults_yaml["users"]
-                        )
-                        # Look for override config
-                        try:
-                            logging.info("Overrides set for %s", user["name"])
-                            for config_setting in user["config"]:
-                                logging.info(
-                                    "Setting " + config_setting + " on " + user["name"]
-                                )
-                                output_yaml_report["users"][user["name"]][
-                                    config_setting
-                                ] = user["config"][config_setting]
-                        except KeyError:
-                            # No overrides set, nothing to do
-                            logging.info("No overrides for %s", user["name"])
-
-                        output_file.write(
-                            "\t"
-                            + "Person("
-                            + user["name"]
-                            + ', "'
-                            + user["name"]
-                            + '", "'
-                            + user["description"]
-                            + '")'
-                            + "\n"
-                        )
-
-                # Look for databases in network
-                for database in resources["databases"]:
-                    if database["network"] == network["name"]:
-                        output_yaml_report["databases"][database["name"]] = deepcopy(
-                            defaults_yaml["databases"]
-                        )
-                        # Look for override config for database
-                        try:
-                            logging.info("Overrides set for %s", database["name"])
-                            for config_setting in database["config"]:
-                                logging.info(
-                                    "Setting "
-                                    + config_setting
-                                    + " on "
-                                    + database["name"]
-                                )
-                                output_yaml_report["databases"][database["name"]][
-                                    config_setting
-                                ] = database["config"][config_setting]
-                        except KeyError:
-                            # No overrides set, nothing to do
-                            logging.info("No overrides for %s", database["name"])
-
-                        output_file.write(
-                            "\t"
-                            + "SystemDb("
-                            + database["name"]
-                            + ","
-                            + '"'
-                            + database["name"]
-                            + ' ", "'
-                            + database["description"]
-                            + '")'
-                            + "\n"
-                        )
-
-                # Look for systems in network
-                for system in resources["systems"]:
-                    if system["network"] == network["name"]:
-                        output_yaml_report["systems"][system["name"]] = deepcopy(
-                            defaults_yaml["systems"]
-                        )
-                        # Look for override config for system
-                        try:
-                            logging.info("Overrides set for %s", system["name"])
-                            for config_setting in system["config"]:
-                                logging.info(
-                                    "Setting "
-                                    + config_setting
-                                    + " on "
-                                    + system["name"]
-                                )
-                                output_yaml_report["systems"][system["name"]][
-                                    config_setting
-                                ] = system["config"][config_setting]
-                        except KeyError:
-                            # No overrides set, nothing to do
-                            logging.info("No overrides for %s", system["name"])
-
-                        output_file.write(
-                            "\t"
-                            + "System("
-                            + system["name"].replace("/", "_")
-                            + ","
-                            + '"'
-                            + system["name"]
-                            + ' ", "'
-                            + system["description"]
-                            + '")'
-                            + "\n"
-                        )
-
-            # Process links between resources
-            for res_links in resources["res_links"]:
-                output_file.write(
-                    "BiRel("
-                    + res_links["source"].replace("/", "_")
-                    + ","
-                    + res_links["destination"].replace("/", "_")
-                    + ', "'
-                    + res_links["description"]
-                    + '")'
-                    + "\n"
-                )
-            output_file.write("@enduml\n")
-            output_file.write("```\n")
-            output_file.write("\n")
-            if plantuml_available:
-                output_file.write("![Diagram](./" + output_file_name + ".svg)")
-
-            # Print final json
-            yaml.dump(output_yaml_report, output_yaml)
-
-            # Insecure resources
-            insecure_resources = resource_validator.main(
-                security_checks_yaml, output_yaml_report
-            )
-            if len(insecure_resources) > 0:
-                # Writing some auto threat modelling
-                output_file.write(
-                    "\n\n"
-                    "| Name | Resources | Finding | Remediation | Query | Severity |"
-                    "\n|-----|-----|-----|-----|-----|-----|\n"
-                )
-                for response in insecure_resources:
-                    response_detail = (
-                        "| "
-                        + response["name"]
-                        + " | "
-                        + response["resource"]
-                        + " | "
-                        + response["description"]
-                        + " | "
-                        + response["remediation"]
-                        + " | "
-                        + response["check_query"]
-                        + " | "
-                        + str(response["severity"])
-                        + " | "
-                        + "\n"
-                    )
-                    output_file.write(response_detail)
+        if profile_checks_markdown:
+            output_sinks.send(pipeline, "check_stats", check_stats)
+    finally:
+        output_sinks.finish(pipeline)
+
+    if profile_checks or profile_checks_markdown:
+        with open(
+            output_file_dir + "/" + output_file_name + "-check-stats.json",
+            "w",
+            encoding="UTF-8",
+        ) as output_stats:
+            json.dump({"check_stats": check_stats}, output_stats, indent=2)
+        logging.info("Security check statistics written")
 
     if plantuml_available:
-        # Generate diagram
+        # Generate diagram next to the report, which links it relative to the output directory
         subprocess.run(
-            ["plantuml", "-tsvg", output_file_name + ".md"],
+            ["plantuml", "-tsvg", output_file_dir + "/" + output_file_name + ".md"],
             stdout=subprocess.DEVNULL,
         )
         logging.info("DFD diagram generated")
 
+    if gate_failed:
+        logging.error(
+            "Findings found with severity %s or lower, failing", fail_on_severity
+        )
+        return False
+
     return True
 
 
+def batch(
+    manifest,
+    security_checks_yaml,
+    check_engine="loop",
+    fail_on_severity=None,
+    batch_workers=1,
+    report_format="yaml",
+):
+    """Generate a report for every model in a batch manifest in a single process.
+
+    The security checks are compiled and plantuml is probed once for the whole batch rather than
+    once per model.
+
+    Args:
+        manifest: The models from get_config.batch_manifest.
+        security_checks_yaml: The security checks yaml file.
+        check_engine: The engine used to evaluate security checks (Default value = "loop").
+        fail_on_severity: Findings with this severity number or lower fail a model
+            (Default value = None).
+        batch_workers: Number of worker processes used to generate reports (Default value = 1).
+        report_format: Format of the machine-readable reports, one of render.REPORT_FORMATS
+            (Default value = "yaml").
+
+    Returns:
+        List of True/False for each model in the manifest, True for success.
+
+    """
+    try:
+        compiled_checks = resource_validator.compile_checks(security_checks_yaml)
+    except SyntaxError as error_message:
+        logging.error(str(error_message))
+        sys.exit(1)
+
+    plantuml_available = probe_plantuml()
+
+    logging.info("Generating reports for %s models", len(manifest))
+    if batch_workers > 1:
+        # Workers compile the checks once at start-up, compiled checks are not picklable
+        with concurrent.futures.ProcessPoolExecutor(
+            max_workers=batch_workers,
+            initializer=_init_batch_worker,
+            initargs=(
+                security_checks_yaml,
+                check_engine,
+                fail_on_severity,
+                plantuml_available,
+                report_format,
+            ),
+        ) as executor:
+            model_results = list(executor.map(_run_batch_worker_model, manifest))
+    else:
+        model_results = [
+            run_model(
+                model,
+                security_checks_yaml,
+                compiled_checks,
+                plantuml_available,
+                check_engine,
+                fail_on_severity,
+                report_format,
+            )
+            for model in manifest
+        ]
+
+    logging.info(
+        "Batch complete: %s of %s models succeeded",
+        model_results.count(True),
+        len(model_results),
+    )
+
+    return model_results
+
+
+def run_model(
+    model,
+    security_checks_yaml,
+    compiled_checks,
+    plantuml_available,
+    check_engine="loop",
+    fail_on_severity=None,
+    report_format="yaml",
+):
+    """Load the input files of a single batch model and generate its report.
+
+    Args:
+        model: A model from get_config.batch_manifest.
+        security_checks_yaml: The security checks yaml file.
+        compiled_checks: Compiled security checks.
+        plantuml_available: Whether plantuml is available.
+        check_engine: The engine used to evaluate security checks (Default value = "loop").
+        fail_on_severity: Findings with this severity number or lower fail the model
+            (Default value = None).
+        report_format: Format of the machine-readable report, one of render.REPORT_FORMATS
+            (Default value = "yaml").
+
+    Returns:
+        bool: The return value. True for success, False otherwise.
+
+    """
+    logging.info("Generating report for %s", model["resource_file"])
+    try:
+        resources_input = get_config.resources(model["resource_file"])
+        config_input = get_config.config(model["config_file"])
+        defaults_input = get_config.defaults(model["defaults_file"])
+        if "swagger_file" in model:
+            swagger_input = get_config.swagger(model["swagger_file"])
+        else:
+            swagger_input = "None"
+    except Exception as error_message:
+        logging.error(
+            "Error loading %s: %s", model["resource_file"], str(error_message)
+        )
+        return False
+
+    try:
+        return main(
+            resources_input,
+            config_input,
+            defaults_input,
+            security_checks_yaml,
+            model["output_dir"],
+            swagger_input,
+            check_engine,
+            fail_on_severity=fail_on_severity,
+            compiled_checks=compiled_checks,
+            plantuml_available=plantuml_available,
+            report_format=report_format,
+            release_resources=True,
+        )
+    except SystemExit:
+        # main exits on invalid inputs, only fail this model
+        logging.error("Failed to generate report for %s", model["resource_file"])
+        return False
+
+
+def _init_batch_worker(
+    security_checks_yaml,
+    check_engine,
+    fail_on_severity,
+    plantuml_available,
+    report_format,
+):
+    """Compile the security checks once when a batch worker process starts.
+
+    Args:
+        security_checks_yaml: The security checks yaml file.
+        check_engine: The engine used to evaluate security checks.
+        fail_on_severity: Findings with this severity number or lower fail a model, or None.
+        plantuml_available: Whether plantuml is available.
+        report_format: Format of the machine-readable reports.
+
+    """
+    global _batch_worker_state  # pylint: disable=global-statement
+    _batch_worker_state = {
+        "security_checks_yaml": security_checks_yaml,
+        "compiled_checks": resource_validator.compile_checks(security_checks_yaml),
+        "check_engine": check_engine,
+        "fail_on_severity": fail_on_severity,
+        "plantuml_available": plantuml_available,
+        "report_format": report_format,
+    }
+
+
+def _run_batch_worker_model(model):
+    """Generate the report of a single batch model in a worker process.
+
+    Args:
+        model: A model from get_config.batch_manifest.
+
+    Returns:
+        bool: The return value. True for success, False otherwise.
+
+    """
+    return run_model(
+        model,
+        _batch_worker_state["security_checks_yaml"],
+        _batch_worker_state["compiled_checks"],
+        _batch_worker_state["plantuml_available"],
+        _batch_worker_state["check_engine"],
+        _batch_worker_state["fail_on_severity"],
+        _batch_worker_state["report_format"],
+    )
+
+
 if __name__ == "__main__":
+    if args.no_input_cache:
+        parse_cache.configure(enabled=False)
+
     if args.version:
         print(VERSION)
         sys.exit(0)
@@ -549,7 +900,37 @@ if __name__ == "__main__":
         init.return_summary(project_config)
         sys.exit(0)
 
-    elif args.demo:
+    if args.clear_cache:
+        parse_cache.clear()
+
+    if args.batch != "None":
+        logging.info("Running in batch mode")
+        if str(args.security_checks_file) != "Default":
+            security_checks_input = get_config.security_checks(
+                args.security_checks_file
+            )
+        else:
+            security_checks_input = get_config.security_checks("default")
+
+        try:
+            batch_manifest = get_config.batch_manifest(args.batch)
+        except Exception as error_message:
+            logging.error("Error loading batch manifest: %s", str(error_message))
+            sys.exit(1)
+
+        batch_results = batch(
+            batch_manifest,
+            security_checks_input,
+            args.check_engine,
+            args.fail_on_severity,
+            args.batch_workers,
+            args.report_format,
+        )
+        if not all(batch_results):
+            sys.exit(1)
+        sys.exit(0)
+
+    if args.demo:
         logging.info("Running in demonstration mode")
         resources_input = get_config.resources("demo")
         config_input = get_config.config("demo")
@@ -575,7 +956,12 @@ if __name__ == "__main__":
                 resource_source_file = args.resources_file
             else:
                 resource_source_file = settings_input["resource_file"]
-            resources_input = get_config.resources(resource_source_file)
+            try:
+                resources_input = get_config.resources(resource_source_file)
+            except Exception as error_message:
+                error_response_list.append(
+                    "Error loading resources file: " + str(error_message)
+                )
         else:
             error_response_list.append(
                 "resource-file is required, see --help for details"
@@ -642,11 +1028,46 @@ if __name__ == "__main__":
             )
             sys.exit(1)
 
-    main(
+    if args.gate_only:
+        if args.fail_on_severity is None:
+            logging.error("--gate-only requires --fail-on-severity")
+            sys.exit(1)
+
+        gate_finding = gate(
+            resources_input,
+            config_input,
+            defaults_input,
+            security_checks_input,
+            args.fail_on_severity,
+            SWAGGER_INPUT,
+            args.check_engine,
+            release_resources=True,
+        )
+        if gate_finding is not None:
+            logging.error(
+                "Security gate failed: %s on %s (severity %s)",
+                gate_finding["name"],
+                gate_finding["resource"],
+                gate_finding["severity"],
+            )
+            sys.exit(1)
+        logging.info("Security gate passed")
+        sys.exit(0)
+
+    if not main(
         resources_input,
         config_input,
         defaults_input,
         security_checks_input,
         args.output_dir,
         SWAGGER_INPUT,
-    )
+        args.check_engine,
+        args.workers,
+        args.fail_on_severity,
+        args.profile_checks,
+        args.profile_checks_markdown,
+        args.adaptive_check_order,
+        report_format=args.report_format,
+        release_resources=True,
+    ):
+        sys.exit(1)
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""Compare the peak memory of pytmac.main with the loaded resources kept or released.
+
+The peak while loading the resources file is reported separately, as the resource model can only
+reduce the memory held once the file is loaded.
+"""
+
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import yaml
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+# pytmac parses the command line when imported
+script_argv = sys.argv
+sys.argv = sys.argv[:1]
+import pytmac  # noqa: E402
+from bin import get_config, resource_model  # noqa: E402
+
+sys.argv = script_argv
+
+
+def generate_resources_yaml(count):
+    """
+    Generate a synthetic resources file with count users, databases and systems in total.
+
+    Args:
+        count: Total number of users, databases and systems to generate
+
+    Returns:
+        Resources file contents
+    """
+    per_type = max(1, count // 3)
+    networks = [
+        {"name": "network_" + str(network), "description": "Synthetic network"}
+        for network in range(max(1, per_type // 50))
+    ]
+
+    def resource(resource_type, number):
+        return {
+            "name": resource_type + "_" + str(number),
+            "description": "Synthetic " + resource_type,
+            "network": networks[number % len(networks)]["name"],
+            "config": {
+                "is_encrypted": number % 2 == 0,
+                "least_privileged_access": number % 3 == 0,
+                "audit_logging_enabled": number % 5 == 0,
+            },
+        }
+
+    return yaml.dump(
+        {
+            "resources": {
+                "networks": networks,
+                "users": [resource("user", number) for number in range(per_type)],
+                "databases": [
+                    resource("database", number) for number in range(per_type)
+                ],
+                "systems": [resource("system", number) for number in range(per_type)],
+                "res_links": [
+                    {
+                        "source": "user_" + str(number),
+                        "destination": "system_" + str(number),
+                        "description": "Synthetic link",
+                    }
+                    for number in range(per_type)
+                ],
+            }
+        },
+        Dumper=get_config.YamlDumper,
+    )
+
+
+def peak_main_bytes(resources_yaml, release_resources):
+    """
+    Return the peak memory allocated while loading the resources and while generating the reports.
+
+    Args:
+        resources_yaml: Resources file contents
+        release_resources: Whether main releases the loaded resources while building the model
+
+    Returns:
+        Tuple of the peak traced memory in bytes while loading and while generating the reports
+    """
+    with tempfile.TemporaryDirectory() as output_dir:
+        tracemalloc.start()
+        resources = yaml.load(resources_yaml, Loader=get_config.YamlLoader)
+        load_peak_bytes = tracemalloc.get_traced_memory()[1]
+        tracemalloc.reset_peak()
+        pytmac.main(
+            resources,
+            get_config.config("demo"),
+            get_config.defaults("demo"),
+            get_config.security_checks("default"),
+            output_dir,
+            "None",
+            plantuml_available=False,
+            release_resources=release_resources,
+        )
+        main_peak_bytes = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    return load_peak_bytes, main_peak_bytes
+
+
+def main():
+    """Print the peak memory of pytmac.main with the loaded resources kept and released."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--resources",
+        default=20000,
+        type=int,
+        help="Number of users, databases and systems in the synthetic model",
+    )
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+
+    resources_yaml = generate_resources_yaml(args.resources)
+
+    # Time building the model outside of tracing
+    resources = yaml.load(resources_yaml, Loader=get_config.YamlLoader)["resources"]
+    start_time = time.perf_counter()
+    resource_model.build(resources)
+    build_seconds = time.perf_counter() - start_time
+    del resources
+
+    print("| Resources | Loaded dictionaries | Load peak (MiB) | Report peak (MiB) |")
+    print("|-----|-----|-----|-----|")
+    for name, release_resources in [
+        ("kept by the caller", False),
+        ("released while building the model", True),
+    ]:
+        peak_bytes = peak_main_bytes(resources_yaml, release_resources)
+        print(
+            "| "
+            + str(args.resources)
+            + " | "
+            + name
+            + " | "
+            + " | ".join(format(held / 1024 / 1024, ".1f") for held in peak_bytes)
+            + " |"
+        )
+    print("Model built in " + format(build_seconds, ".3f") + " seconds")
+
+
+if __name__ == "__main__":
+    main()
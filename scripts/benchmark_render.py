@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""Compare the per-element write path with the buffered templates of bin/render.py."""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from bin import input_validator, render, resource_model  # noqa: E402
+
+
+def generate_resources(count):
+    """
+    Generate synthetic resources with count elements across all resource types.
+
+    Args:
+        count: Total number of users, databases, systems and links to generate
+
+    Returns:
+        Resources
+    """
+    per_type = max(1, count // 4)
+    networks = [
+        {"name": "network_" + str(network), "description": "Synthetic network"}
+        for network in range(max(1, per_type // 50))
+    ]
+
+    def resource(resource_type, number):
+        return {
+            "name": resource_type + "_" + str(number),
+            "description": "Synthetic " + resource_type,
+            "network": networks[number % len(networks)]["name"],
+        }
+
+    return {
+        "networks": networks,
+        "users": [resource("user", number) for number in range(per_type)],
+        "databases": [resource("database", number) for number in range(per_type)],
+        "systems": [resource("system", number) for number in range(per_type)],
+        "res_links": [
+            {
+                "source": "user_" + str(number),
+                "destination": "system_" + str(number),
+                "description": "Synthetic link",
+            }
+            for number in range(per_type)
+        ],
+    }
+
+
+def write_unbuffered(output_file, resources, resource_index):
+    """
+    Write the data flow diagram one concatenated element at a time, as pytmac did before render.
+
+    Args:
+        output_file: The file to write to
+        resources: The resource model
+        resource_index: The index from input_validator.index_resources
+    """
+    output_file.write("# Data Flow Diagram\n")
+    output_file.write("```plantuml\n")
+    output_file.write("@startuml benchmark\n")
+    output_file.write(
+        "!include https://raw.githubusercontent.com/"
+        "plantuml-stdlib/C4-PlantUML/master/C4_Container.puml\n"
+    )
+    output_file.write(
+        "!include https://raw.githubusercontent.com/"
+        "geret1/plantuml-schemas/main/stride.puml\n"
+    )
+    output_file.write("\n")
+    for network in resources["networks"]:
+        output_file.write(
+            "Boundary(b" + network.name + ', "' + network.name + '") {' + "\n"
+        )
+        network_resources = resource_index["network_resources"].get(
+            network.name, {"users": [], "databases": [], "systems": []}
+        )
+        for user in network_resources["users"]:
+            output_file.write(
+                "\t"
+                + "Person("
+                + user.name
+                + ', "'
+                + user.name
+                + '", "'
+                + user.description
+                + '")'
+                + "\n"
+            )
+        for database in network_resources["databases"]:
+            output_file.write(
+                "\t"
+                + "SystemDb("
+                + database.name
+                + ","
+                + '"'
+                + database.name
+                + ' ", "'
+                + database.description
+                + '")'
+                + "\n"
+            )
+        for system in network_resources["systems"]:
+            output_file.write(
+                "\t"
+                + "System("
+                + system.name.replace("/", "_")
+                + ","
+                + '"'
+                + system.name
+                + ' ", "'
+                + system.description
+                + '")'
+                + "\n"
+            )
+    for res_links in resources["res_links"]:
+        output_file.write(
+            "BiRel("
+            + res_links.source.replace("/", "_")
+            + ","
+            + res_links.destination.replace("/", "_")
+            + ', "'
+            + res_links.description
+            + '")'
+            + "\n"
+        )
+    output_file.write("@enduml\n")
+    output_file.write("```\n")
+    output_file.write("\n")
+
+
+def write_buffered(output_file, resources, resource_index):
+    """
+    Write the data flow diagram with the render templates in buffered blocks.
+
+    Args:
+        output_file: The file to write to
+        resources: The resource model
+        resource_index: The index from input_validator.index_resources
+    """
+    render.write_lines(
+        output_file, render.dfd_lines(resources, resource_index, "benchmark", False)
+    )
+
+
+def time_writer(writer, output_path, resources, resource_index, repeat):
+    """
+    Time writing the data flow diagram to a file.
+
+    Args:
+        writer: Function writing the diagram
+        output_path: File to write to
+        resources: The resource model
+        resource_index: The index from input_validator.index_resources
+        repeat: Number of times to repeat the measurement, the fastest is kept
+
+    Returns:
+        Tuple of the fastest time in seconds and the written text
+    """
+    times = []
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        with open(output_path, "w", encoding="UTF-8") as output_file:
+            writer(output_file, resources, resource_index)
+        times.append(time.perf_counter() - start_time)
+
+    with open(output_path, "r", encoding="UTF-8") as output_file:
+        return min(times), output_file.read()
+
+
+def main():
+    """Print the data flow diagram render times of both write paths."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--elements",
+        default=50000,
+        type=int,
+        help="Number of users, databases, systems and links in the synthetic model",
+    )
+    parser.add_argument(
+        "--repeat",
+        default=5,
+        type=int,
+        help="Number of times to repeat each measurement, the fastest is kept",
+    )
+    parser.add_argument(
+        "--output",
+        default="benchmark-render.md",
+        help="File written during the benchmark, removed afterwards",
+    )
+    args = parser.parse_args()
+
+    resources = resource_model.build(generate_resources(args.elements))
+    resource_index = input_validator.index_resources(resources)
+
+    try:
+        unbuffered_seconds, unbuffered_text = time_writer(
+            write_unbuffered, args.output, resources, resource_index, args.repeat
+        )
+        buffered_seconds, buffered_text = time_writer(
+            write_buffered, args.output, resources, resource_index, args.repeat
+        )
+    finally:
+        if os.path.exists(args.output):
+            os.remove(args.output)
+
+    if unbuffered_text != buffered_text:
+        print("Rendered output differs between the write paths")
+        sys.exit(1)
+
+    print("| Elements | Size (KiB) | Write path | Seconds |")
+    print("|-----|-----|-----|-----|")
+    for name, seconds in [
+        ("per element", unbuffered_seconds),
+        ("buffered templates", buffered_seconds),
+    ]:
+        print(
+            "| "
+            + str(args.elements)
+            + " | "
+            + str(len(buffered_text) // 1024)
+            + " | "
+            + name
+            + " | "
+            + format(seconds, ".3f")
+            + " |"
+        )
+
+
+if __name__ == "__main__":
+    main()
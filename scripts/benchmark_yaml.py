@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""Compare YAML load and dump times of the LibYAML and pure Python PyYAML implementations."""
+
+import argparse
+import io
+import time
+
+import yaml
+
+
+def generate_resources(count):
+    """
+    Generate a synthetic resources document in the format of resources.yaml.
+
+    Args:
+        count: Number of resources of each type to generate
+
+    Returns:
+        Resources document
+    """
+    networks = [
+        {"name": "network_" + str(network), "description": "Synthetic network"}
+        for network in range(max(1, count // 50))
+    ]
+
+    def resource(resource_type, number):
+        return {
+            "name": resource_type + "_" + str(number),
+            "description": "Synthetic " + resource_type,
+            "network": networks[number % len(networks)]["name"],
+            "config": {
+                "is_encrypted": number % 2 == 0,
+                "uses_mfa": number % 3 == 0,
+                "environment": "production" if number % 4 else "staging",
+                "open_ports": [80, 443, 8000 + number % 100],
+            },
+        }
+
+    return {
+        "resources": {
+            "networks": networks,
+            "users": [resource("user", number) for number in range(count)],
+            "databases": [resource("database", number) for number in range(count)],
+            "systems": [resource("system", number) for number in range(count)],
+            "res_links": [
+                {
+                    "source": "user_" + str(number),
+                    "destination": "system_" + str(number),
+                    "description": "Synthetic link",
+                }
+                for number in range(count)
+            ],
+        }
+    }
+
+
+def time_implementation(document_text, document, loader, dumper, repeat):
+    """
+    Time loading and dumping a document with a loader and dumper.
+
+    Args:
+        document_text: The document as YAML
+        document: The document as Python objects
+        loader: The PyYAML loader class
+        dumper: The PyYAML dumper class
+        repeat: Number of times to repeat each measurement, the fastest is kept
+
+    Returns:
+        Tuple of the load and dump time in seconds
+    """
+    load_times = []
+    dump_times = []
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        yaml.load(io.StringIO(document_text), Loader=loader)
+        load_times.append(time.perf_counter() - start_time)
+
+        start_time = time.perf_counter()
+        yaml.dump(document, io.StringIO(), Dumper=dumper)
+        dump_times.append(time.perf_counter() - start_time)
+
+    return min(load_times), min(dump_times)
+
+
+def main():
+    """Print the YAML load and dump times of each available implementation."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--resources",
+        default=[100, 1000, 5000],
+        type=int,
+        nargs="+",
+        help="Number of resources of each type in the synthetic files",
+    )
+    parser.add_argument(
+        "--repeat",
+        default=3,
+        type=int,
+        help="Number of times to repeat each measurement, the fastest is kept",
+    )
+    args = parser.parse_args()
+
+    implementations = [("pure python", yaml.SafeLoader, yaml.SafeDumper)]
+    if yaml.__with_libyaml__:
+        implementations.append(("libyaml", yaml.CSafeLoader, yaml.CSafeDumper))
+    else:
+        print("PyYAML was built without LibYAML, only timing the pure Python path")
+
+    print("| Resources | Size (KiB) | Implementation | Load (s) | Dump (s) |")
+    print("|-----|-----|-----|-----|-----|")
+    for count in args.resources:
+        document = generate_resources(count)
+        document_text = yaml.dump(document, Dumper=implementations[-1][2])
+        for name, loader, dumper in implementations:
+            load_seconds, dump_seconds = time_implementation(
+                document_text, document, loader, dumper, args.repeat
+            )
+            print(
+                "| "
+                + str(count)
+                + " | "
+                + str(len(document_text) // 1024)
+                + " | "
+                + name
+                + " | "
+                + format(load_seconds, ".3f")
+                + " | "
+                + format(dump_seconds, ".3f")
+                + " |"
+            )
+
+
+if __name__ == "__main__":
+    main()
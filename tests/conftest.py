@@ -0,0 +1,6 @@
+from bin import parse_cache as parse_cache
+
+# Test modules load their inputs when imported, so the parsed input cache is disabled before any
+# of them is collected to keep pickles out of the user's cache directory. test_parse_cache points
+# the cache at a temporary directory for each of its tests.
+parse_cache.configure(enabled=False)
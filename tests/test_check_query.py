@@ -0,0 +1,186 @@
+import pytest
+
+from bin import check_query as check_query
+
+resource_config = {
+    "company_user": True,
+    "company_device": False,
+    "environment": "production",
+    "open_ports": 3,
+}
+
+
+def test_legacy_syntax_translated():
+    """
+    Validate the legacy resources[resource]["x"] syntax is translated to attribute lookups
+    :return: True/False
+    """
+    assert check_query.parse(
+        'resources[resource]["company_user"] and not resources[resource]["company_device"]'
+    ) == ("and", (("attr", "company_user"), ("not", ("attr", "company_device"))))
+
+
+def test_query_language():
+    """
+    Validate attribute access, comparisons and parentheses evaluate as expected
+    :return: True/False
+    """
+    predicate = check_query.compile_query(
+        '(resource.company_user and not company_device) and environment == "production"'
+        " and open_ports > 2 and environment in ['production', 'staging']"
+    )
+
+    assert predicate(resource_config)
+    assert not predicate(resource_config | {"open_ports": 1})
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        '__import__("os").system("true")',
+        "resources.clear()",
+        "[x for x in company_user]",
+        "lambda: company_user",
+    ],
+)
+def test_unsafe_syntax_rejected(query):
+    """
+    Validate syntax outside of the check language is rejected
+    :return: True/False
+    """
+    with pytest.raises(SyntaxError):
+        check_query.parse(query)
+
+
+def test_constant_folding():
+    """
+    Validate constant sub-expressions are folded away
+    :return: True/False
+    """
+    assert check_query.fold(check_query.parse("company_user and not False")) == (
+        "attr",
+        "company_user",
+    )
+    assert check_query.fold(check_query.parse("company_user or 1 < 2")) == (
+        "const",
+        True,
+    )
+
+
+def test_reorder_cheapest_first():
+    """
+    Validate and/or operands are reordered so the cheapest run first
+    :return: True/False
+    """
+    query_tree = check_query.parse(
+        "(not company_user or environment == 'production') and company_device"
+    )
+
+    assert check_query.reorder(query_tree)[1][0] == ("attr", "company_device")
+
+
+def test_reorder_by_selectivity():
+    """
+    Validate or operands most likely true and and operands most likely false run first
+    :return: True/False
+    """
+    clause_stats = {
+        check_query.clause_key(("attr", "company_user")): [9, 10],
+        check_query.clause_key(("attr", "company_device")): [1, 10],
+    }
+    key = check_query.selectivity_key(clause_stats)
+
+    assert check_query.reorder(
+        check_query.parse("company_device or company_user"), key
+    ) == ("or", (("attr", "company_user"), ("attr", "company_device")))
+    assert check_query.reorder(
+        check_query.parse("company_user and company_device"), key
+    ) == ("and", (("attr", "company_device"), ("attr", "company_user")))
+
+
+def test_clause_counts():
+    """
+    Validate clause results are counted and selectivity ordering keeps the query result
+    :return: True/False
+    """
+    clause_counts = {}
+    query = "company_device or company_user"
+    counted_query = check_query.compile_query(query, None, clause_counts)
+
+    assert counted_query(resource_config)
+    assert clause_counts[check_query.clause_key(("attr", "company_device"))] == [0, 1]
+
+    reordered_query = check_query.compile_query(query, clause_counts)
+    assert reordered_query(resource_config) == counted_query(resource_config)
+
+
+def test_reorder_missing_attribute():
+    """
+    Validate reordering does not raise for a missing attribute the original order never reaches
+    :return: True/False
+    """
+    query = (
+        'not resources[resource]["is_encrypted"] or resources[resource]["legacy_flag"]'
+    )
+    compiled_query = check_query.compile_query(query)
+
+    assert check_query.reorder(check_query.parse(query))[1][0] == (
+        "attr",
+        "legacy_flag",
+    )
+    assert compiled_query({"is_encrypted": False})
+    assert not compiled_query({"is_encrypted": True, "legacy_flag": False})
+    with pytest.raises(KeyError):
+        compiled_query({"is_encrypted": True})
+
+
+def test_reorder_comparison_error():
+    """
+    Validate reordering does not raise for a comparison the original order never reaches
+    :return: True/False
+    """
+    query = "not (is_set and has_limit) or threshold > 3"
+    compiled_query = check_query.compile_query(query)
+
+    assert check_query.reorder(check_query.parse(query))[1][0][0] == "compare"
+    assert compiled_query({"is_set": False, "has_limit": False, "threshold": None})
+    assert compiled_query({"is_set": True, "has_limit": True, "threshold": 4})
+    with pytest.raises(TypeError):
+        compiled_query({"is_set": True, "has_limit": True, "threshold": None})
+
+
+def test_selectivity_missing_attribute():
+    """
+    Validate selectivity ordering does not raise for a missing attribute or comparison the original
+    order skips
+    :return: True/False
+    """
+    clause_stats = {
+        check_query.clause_key(("attr", "is_encrypted")): [9, 10],
+        check_query.clause_key(("attr", "legacy_flag")): [1, 10],
+    }
+    query = "is_encrypted and legacy_flag"
+    compiled_query = check_query.compile_query(query, clause_stats)
+
+    assert check_query.reorder(
+        check_query.parse(query), check_query.selectivity_key(clause_stats)
+    )[1][0] == ("attr", "legacy_flag")
+    assert not compiled_query({"is_encrypted": False})
+    assert compiled_query({"is_encrypted": True, "legacy_flag": True})
+    with pytest.raises(KeyError):
+        compiled_query({"is_encrypted": True})
+
+    clause_stats[check_query.clause_key(check_query.parse("threshold > 3"))] = [1, 10]
+    query = "is_encrypted and threshold > 3"
+    compiled_query = check_query.compile_query(query, clause_stats)
+
+    assert (
+        check_query.reorder(
+            check_query.parse(query), check_query.selectivity_key(clause_stats)
+        )[1][0][0]
+        == "compare"
+    )
+    assert not compiled_query({"is_encrypted": False, "threshold": None})
+    assert compiled_query({"is_encrypted": True, "threshold": 4})
+    with pytest.raises(TypeError):
+        compiled_query({"is_encrypted": True, "threshold": None})
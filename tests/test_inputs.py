@@ -10,6 +10,8 @@ import tests.bin.config as config
 import tests.bin.dirs as dirs
 import pytmac
 from bin import get_config as get_config
+from bin import input_validator as input_validator
+from bin import resource_model as resource_model
 
 RESOURCES_FILE = "tests/docs/test_resources.yaml"
 CONFIG_FILE = "tests/docs/test_config.yaml"
@@ -600,6 +602,94 @@ def test_resources_res_link_destination(caplog):
     ]
 
 
+def test_resources_all_errors_reported(caplog):
+    caplog.set_level(logging.ERROR)
+
+    resources_input = {
+        "resources": {
+            "networks": [{"name": "home_network"}],
+            "users": [
+                {"name": "test_user", "network": "home_network"},
+                {"name": "test_user2", "description": "Testing user"},
+            ],
+            "databases": [],
+            "res_links": [{"source": "test_user", "description": "Test connection"}],
+        }
+    }
+
+    with pytest.raises(SystemExit) as pytest_wrapped_e:
+        pytmac.main(
+            resources_input,
+            config_input,
+            defaults_input,
+            security_checks_input,
+            OUTPUT_DIR,
+            swagger_input,
+        )
+
+    assert caplog.record_tuples == [
+        ("root", logging.ERROR, "systems not found in resources"),
+        (
+            "root",
+            logging.ERROR,
+            "Required field not set for user (Required: name, network, description): {'name': 'test_user', 'network': 'home_network'}",
+        ),
+        (
+            "root",
+            logging.ERROR,
+            "Required field not set for user (Required: name, network, description): {'name': 'test_user2', 'description': 'Testing user'}",
+        ),
+        (
+            "root",
+            logging.ERROR,
+            "Required field not set for res_link (Required: source, destination, description): {'source': 'test_user', 'description': 'Test connection'}",
+        ),
+        ("root", logging.ERROR, "Resources validation failed!"),
+    ]
+    assert [
+        (error["path"], error["missing"])
+        for error in input_validator.resource_errors(resources_input)
+    ] == [
+        ("resources.systems", []),
+        ("resources.users[0]", ["description"]),
+        ("resources.users[1]", ["network"]),
+        ("resources.res_links[0]", ["destination"]),
+    ]
+
+
+def test_resources_unknown_references(caplog):
+    caplog.set_level(logging.WARNING)
+
+    resources = {
+        "networks": [{"name": "home_network"}],
+        "users": [
+            {"name": "test_user", "network": "home_network", "description": "Testing"},
+            {"name": "test_user2", "network": "home_netwrk", "description": "Testing"},
+        ],
+        "databases": [],
+        "systems": [],
+        "res_links": [
+            {"source": "test_user", "destination": "test_usr", "description": "Test"}
+        ],
+    }
+    model = resource_model.build(resources)
+    resource_index = input_validator.index_resources(model)
+
+    assert not input_validator.references(model, resource_index)
+    assert caplog.record_tuples == [
+        (
+            "root",
+            logging.WARNING,
+            "Unknown network home_netwrk on users test_user2, did you mean home_network?",
+        ),
+        (
+            "root",
+            logging.WARNING,
+            "Unknown res_link destination test_usr (test_user -> test_usr), did you mean test_user?",
+        ),
+    ]
+
+
 def test_defaults_top_level_systems_missing(caplog):
     caplog.set_level(logging.ERROR)
 
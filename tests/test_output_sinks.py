@@ -0,0 +1,73 @@
+import threading
+
+import pytest
+
+from bin import output_sinks as output_sinks
+
+
+def test_events_reach_every_sink():
+    """
+    Validate every sink receives every event in the order sent
+    :return: True/False
+    """
+    received = {"first": [], "second": []}
+
+    def sink(events, name):
+        for event in events:
+            received[name].append(event)
+
+    pipeline = output_sinks.start(
+        [
+            lambda events: sink(events, "first"),
+            lambda events: sink(events, "second"),
+        ]
+    )
+    for number in range(100):
+        output_sinks.send(pipeline, "finding", number)
+    output_sinks.finish(pipeline)
+
+    expected = [("finding", number) for number in range(100)]
+    assert received == {"first": expected, "second": expected}
+
+
+def test_slow_sink_blocks_producer():
+    """
+    Validate send waits for a sink whose queue is full instead of queueing more events
+    :return: True/False
+    """
+    release_sink = threading.Event()
+
+    def slow_sink(events):
+        for _ in events:
+            release_sink.wait()
+
+    pipeline = output_sinks.start([slow_sink], queue_size=1)
+    # The sink holds the first event, the queue holds the second
+    output_sinks.send(pipeline, "finding", 1)
+    output_sinks.send(pipeline, "finding", 2)
+
+    producer = threading.Thread(target=output_sinks.send, args=(pipeline, "finding", 3))
+    producer.start()
+    producer.join(0.5)
+    assert producer.is_alive()
+
+    release_sink.set()
+    producer.join()
+    output_sinks.finish(pipeline)
+
+
+def test_failed_sink_raises():
+    """
+    Validate the exception of a failed sink is raised to the producer instead of blocking it
+    :return: True/False
+    """
+
+    def failing_sink(events):
+        next(events)
+        raise OSError("Disk full")
+
+    pipeline = output_sinks.start([failing_sink], queue_size=1)
+    with pytest.raises(OSError, match="Disk full"):
+        for number in range(10):
+            output_sinks.send(pipeline, "finding", number)
+        output_sinks.finish(pipeline)
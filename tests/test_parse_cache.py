@@ -0,0 +1,109 @@
+import os
+
+import pytest
+
+from bin import get_config as get_config
+from bin import parse_cache as parse_cache
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path):
+    """
+    Point the parsed input cache at a temporary directory for each test
+    :return:
+    """
+    parse_cache.configure(cache_dir=str(tmp_path / "cache"))
+    yield str(tmp_path / "cache")
+    parse_cache.configure(enabled=False)
+
+
+def test_unchanged_file_not_parsed(tmp_path):
+    """
+    Validate an unchanged file is returned from the cache without being parsed again
+    :return: True/False
+    """
+    parsed = []
+
+    def parser(contents):
+        parsed.append(contents)
+        return {"contents": contents}
+
+    input_file = tmp_path / "input.yaml"
+    input_file.write_text("first")
+    for _ in range(2):
+        with open(input_file, "r", encoding="UTF-8") as document_file:
+            assert parse_cache.parse(document_file, parser) == {"contents": "first"}
+
+    assert parsed == ["first"]
+
+    # Same size, only the content hash differs
+    input_file.write_text("other")
+    with open(input_file, "r", encoding="UTF-8") as document_file:
+        assert parse_cache.parse(document_file, parser) == {"contents": "other"}
+
+    assert parsed == ["first", "other"]
+    assert os.stat(tmp_path / "cache").st_mode & 0o777 == 0o700
+
+
+def test_get_config_uses_cache(tmp_path, cache_dir):
+    """
+    Validate get_config documents read from the cache match freshly parsed documents
+    :return: True/False
+    """
+    parse_cache.configure(enabled=False)
+    uncached_resources = get_config.resources("tests/docs/test_resources.yaml")
+    uncached_swagger = get_config.swagger("conf/swagger.json")
+
+    parse_cache.configure(cache_dir=cache_dir)
+    for _ in range(2):
+        assert get_config.resources("tests/docs/test_resources.yaml") == (
+            uncached_resources
+        )
+        assert get_config.swagger("conf/swagger.json") == uncached_swagger
+
+    assert len(os.listdir(cache_dir)) == 2
+
+
+def test_size_cap_evicts_entries(tmp_path, cache_dir):
+    """
+    Validate the least recently used entries are evicted over the size limit
+    :return: True/False
+    """
+    parse_cache.configure(cache_dir=cache_dir, max_bytes=1)
+    for name in ["first", "second"]:
+        input_file = tmp_path / (name + ".yaml")
+        input_file.write_text(name)
+        with open(input_file, "r", encoding="UTF-8") as document_file:
+            parse_cache.parse(document_file, str)
+
+    assert len(os.listdir(cache_dir)) == 0
+
+    parse_cache.configure(cache_dir=cache_dir)
+    with open(tmp_path / "first.yaml", "r", encoding="UTF-8") as document_file:
+        parse_cache.parse(document_file, str)
+    parse_cache.clear(cache_dir)
+
+    assert len(os.listdir(cache_dir)) == 0
+
+
+def test_shared_cache_dir_not_used(tmp_path, cache_dir):
+    """
+    Validate a cache directory other users can write to is neither read nor written
+    :return: True/False
+    """
+    parsed = []
+
+    def parser(contents):
+        parsed.append(contents)
+        return contents
+
+    os.makedirs(cache_dir)
+    os.chmod(cache_dir, 0o777)
+    input_file = tmp_path / "input.yaml"
+    input_file.write_text("first")
+    for _ in range(2):
+        with open(input_file, "r", encoding="UTF-8") as document_file:
+            assert parse_cache.parse(document_file, parser) == "first"
+
+    assert parsed == ["first", "first"]
+    assert len(os.listdir(cache_dir)) == 0
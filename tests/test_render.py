@@ -0,0 +1,143 @@
+import io
+import json
+from collections import ChainMap
+from datetime import date
+
+import yaml
+
+from bin import get_config as get_config
+from bin import input_validator as input_validator
+from bin import render as render
+from bin import resource_model as resource_model
+
+RESOURCES = {
+    "networks": [{"name": "public", "description": "Public network"}],
+    "users": [{"name": "user", "description": "A user", "network": "public"}],
+    "databases": [{"name": "db", "description": "A database", "network": "public"}],
+    "systems": [{"name": "/api/v1", "description": "An endpoint", "network": "public"}],
+    "res_links": [{"source": "user", "destination": "/api/v1", "description": "Calls"}],
+}
+
+
+def test_dfd_lines():
+    """
+    Validate the rendered data flow diagram lines for each element type
+    :return: True/False
+    """
+    resources = resource_model.build(RESOURCES)
+    lines = list(
+        render.dfd_lines(
+            resources, input_validator.index_resources(resources), "report", True
+        )
+    )
+
+    assert lines == [
+        render.HEADER_TEMPLATE % "report",
+        'Boundary(bpublic, "public") {\n',
+        '\tPerson(user, "user", "A user")\n',
+        '\tSystemDb(db,"db ", "A database")\n',
+        '\tSystem(_api_v1,"/api/v1 ", "An endpoint")\n',
+        'BiRel(user,_api_v1, "Calls")\n',
+        "@enduml\n```\n\n",
+        "![Diagram](./report.svg)",
+    ]
+
+
+def test_finding_row():
+    """
+    Validate a finding is rendered as a findings table row
+    :return: True/False
+    """
+    assert render.finding_row(
+        {
+            "name": "Unencrypted",
+            "resource": "db",
+            "description": "Not encrypted",
+            "remediation": "Encrypt it",
+            "check_query": "is_encrypted == False",
+            "severity": 1,
+        }
+    ) == (
+        "| Unencrypted | db | Not encrypted | Encrypt it | is_encrypted == False | 1 | \n"
+    )
+
+
+def test_write_lines_in_blocks():
+    """
+    Validate buffered lines are written in blocks, with the remainder written at the end
+    :return: True/False
+    """
+    writes = []
+
+    class OutputFile(io.StringIO):
+        def write(self, text):
+            writes.append(text)
+            return super().write(text)
+
+    output_file = OutputFile()
+    render.write_lines(output_file, (str(number) for number in range(5)), 2)
+
+    assert writes == ["01", "23", "4"]
+    assert output_file.getvalue() == "01234"
+
+
+def test_write_yaml_report():
+    """
+    Validate the YAML report written one resource at a time matches dumping the whole report
+    :return: True/False
+    """
+    defaults = {"ports": [80, 443], "environment": "production " * 10, "version": "1.0"}
+    report = {
+        "networks": {},
+        "users": {"user": ChainMap({"uses_mfa": True}, defaults)},
+        "databases": {"10": ChainMap({}, defaults)},
+        "systems": {"/api/v1": ChainMap({"ports": []}, defaults)},
+    }
+
+    output_yaml = io.StringIO()
+    render.write_yaml_report(output_yaml, report)
+
+    assert output_yaml.getvalue() == yaml.dump(
+        {
+            resource_type: {
+                resource_name: dict(resource_config)
+                for resource_name, resource_config in type_resources.items()
+            }
+            for resource_type, type_resources in report.items()
+        },
+        Dumper=get_config.ReportDumper,
+    )
+
+
+def test_ndjson_lines():
+    """
+    Validate resources and findings are rendered as compact JSON lines
+    :return: True/False
+    """
+    report = {"networks": {"public": ChainMap({}, {"is_public": True})}, "users": {}}
+
+    assert list(render.ndjson_resource_lines(report)) == [
+        '{"config":{"is_public":true},"name":"public","record":"resource",'
+        '"resource_type":"networks"}\n'
+    ]
+    assert render.ndjson_finding_line({"name": "Public", "severity": 1}) == (
+        '{"name":"Public","record":"finding","severity":1}\n'
+    )
+
+
+def test_json_reports_dates():
+    """
+    Validate dates loaded from YAML overrides are written to the JSON reports as strings
+    :return: True/False
+    """
+    report = {"systems": {"api": ChainMap({"review_date": date(2024, 1, 1)}, {})}}
+
+    output_json = io.StringIO()
+    render.write_json_report(output_json, report)
+
+    assert json.loads(output_json.getvalue()) == {
+        "systems": {"api": {"review_date": "2024-01-01"}}
+    }
+    assert json.loads(list(render.ndjson_resource_lines(report))[0])["config"] == {
+        "review_date": "2024-01-01"
+    }
@@ -3,6 +3,7 @@ import os
 from datetime import date
 
 import pytest
+import yaml
 
 import tests.bin.dirs as dirs
 from bin import get_config as get_config
@@ -164,6 +165,7 @@ def test_report_contents():
 
     assert True
 
+
 # Test if svg is generated and valid
 def test_report_svg():
     """
@@ -216,3 +218,88 @@ def test_report_svg():
             print("PASS - " + str(check))
 
     assert True
+
+
+def test_batch_reports(tmp_path):
+    """
+    Function to verify a batch manifest generates one report per model, failing missing models
+    :return: True/False
+    """
+    for model in ["first", "second"]:
+        os.makedirs(tmp_path / model)
+    with open(tmp_path / "manifest.yaml", "w") as manifest_file:
+        manifest_file.write(
+            "models:\n"
+            + "".join(
+                "  - resource_file: " + resource_file + "\n"
+                "    config_file: " + os.path.abspath(CONFIG_FILE) + "\n"
+                "    defaults_file: " + os.path.abspath(DEFAULTS_FILE) + "\n"
+                "    output_dir: " + model + "\n"
+                for resource_file, model in [
+                    (os.path.abspath(RESOURCES_FILE), "first"),
+                    (os.path.abspath(RESOURCES_FILE), "second"),
+                    ("missing_resources.yaml", "first"),
+                ]
+            )
+        )
+
+    batch_manifest = get_config.batch_manifest(str(tmp_path / "manifest.yaml"))
+    assert batch_manifest[0]["output_dir"] == str(tmp_path / "first")
+
+    assert pytmac.batch(batch_manifest, security_checks_input) == [
+        True,
+        True,
+        False,
+    ]
+    for model in ["first", "second"]:
+        assert os.path.isfile(
+            tmp_path / model / ("report-" + str(date.today()) + ".md")
+        )
+
+
+def test_report_formats(tmp_path):
+    """
+    Function to verify the json and ndjson reports hold the same resources as the yaml report
+    :return: True/False
+    """
+    reports = {}
+    for report_format in ["yaml", "json", "ndjson"]:
+        os.makedirs(tmp_path / report_format)
+        assert pytmac.main(
+            get_config.resources(RESOURCES_FILE),
+            config_input,
+            defaults_input,
+            security_checks_input,
+            str(tmp_path / report_format),
+            "None",
+            report_format=report_format,
+        )
+        with open(
+            tmp_path
+            / report_format
+            / ("report-" + str(date.today()) + "." + report_format),
+            "r",
+        ) as report_file:
+            reports[report_format] = report_file.read()
+
+    yaml_report = yaml.safe_load(reports["yaml"])
+    assert json.loads(reports["json"]) == yaml_report
+
+    ndjson_report = {}
+    for line in reports["ndjson"].splitlines():
+        record = json.loads(line)
+        if record["record"] == "resource":
+            ndjson_report.setdefault(record["resource_type"], {})[
+                record["name"]
+            ] = record["config"]
+        else:
+            assert record["record"] == "finding"
+            assert any(
+                record["resource"] in type_resources
+                for type_resources in yaml_report.values()
+            )
+    assert ndjson_report == {
+        resource_type: type_resources
+        for resource_type, type_resources in yaml_report.items()
+        if type_resources
+    }
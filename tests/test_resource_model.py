@@ -0,0 +1,63 @@
+from bin import get_config as get_config
+from bin import resource_model as resource_model
+
+RESOURCES_FILE = "tests/docs/test_resources.yaml"
+
+
+def test_export_matches_resources_file():
+    """
+    Validate the model exports to the resources it was built from
+    :return: True/False
+    """
+    resources = get_config.resources(RESOURCES_FILE)["resources"]
+    model = resource_model.build(resources)
+
+    assert isinstance(model["users"][0], resource_model.User)
+    assert isinstance(model["res_links"][0], resource_model.Link)
+    assert resource_model.export(model) == {
+        resource_type: resources.get(resource_type) or []
+        for resource_type in resource_model.MODEL_TYPES
+    }
+
+
+def test_names_interned():
+    """
+    Validate resources share one string for the same network and setting names
+    :return: True/False
+    """
+    model = resource_model.build(
+        {
+            "users": [
+                {
+                    "name": "user_" + str(number),
+                    "description": "A user",
+                    "network": "".join(["home_", "network"]),
+                    "config": {"".join(["uses_", "mfa"]): True},
+                }
+                for number in range(2)
+            ]
+        }
+    )
+    first_user, second_user = model["users"]
+
+    assert first_user.network is second_user.network
+    assert list(first_user.config)[0] is list(second_user.config)[0]
+    assert not hasattr(first_user, "__dict__")
+
+
+def test_build_releases_resources():
+    """
+    Validate the resource dictionaries are released in order when the model is built with release
+    :return: True/False
+    """
+    resources = get_config.resources(RESOURCES_FILE)["resources"]
+    expected = {
+        resource_type: list(resources.get(resource_type) or [])
+        for resource_type in resource_model.MODEL_TYPES
+    }
+    model = resource_model.build(resources, release=True)
+
+    assert all(
+        not resources.get(resource_type) for resource_type in resource_model.MODEL_TYPES
+    )
+    assert resource_model.export(model) == expected
@@ -0,0 +1,275 @@
+import pytest
+
+from bin import get_config as get_config
+from bin import resource_validator as resource_validator
+
+SECURITY_CHECKS_FILE = "conf/security_checks.yaml"
+
+security_checks_input = get_config.security_checks(SECURITY_CHECKS_FILE)
+
+output_report = {
+    "networks": {"home_network": {}},
+    "users": {
+        "test_user": {"company_user": True, "company_device": False},
+        "test_user2": {"company_user": True, "company_device": True},
+    },
+    "databases": {},
+    "systems": {},
+}
+
+
+def test_compile_checks():
+    """
+    Compile the shipped security checks and validate every check is compiled
+    :return: True/False
+    """
+    compiled_checks = resource_validator.compile_checks(security_checks_input)
+
+    assert list(compiled_checks.keys()) == list(security_checks_input.keys())
+
+
+def test_compile_checks_error_names_check():
+    """
+    Validate a broken check_query is reported once with the name of the check
+    :return: True/False
+    """
+    broken_checks = {
+        "broken_check": {
+            "name": "Broken check",
+            "check_query": ['resources[resource]["company_user"] and and'],
+        }
+    }
+
+    with pytest.raises(SyntaxError, match="broken_check"):
+        resource_validator.compile_checks(broken_checks)
+
+
+def test_compiled_check_findings():
+    """
+    Validate compiled checks return the same findings as uncompiled checks
+    :return: True/False
+    """
+    compiled_checks = resource_validator.compile_checks(security_checks_input)
+
+    compiled_results = resource_validator.do_check(
+        output_report,
+        security_checks_input["user_owned_device"],
+        compiled_checks["user_owned_device"],
+    )
+    uncompiled_results = resource_validator.do_check(
+        output_report, security_checks_input["user_owned_device"]
+    )
+
+    assert compiled_results == uncompiled_results
+    assert [result["resource"] for result in compiled_results] == ["test_user"]
+
+
+def test_bitset_engine_findings():
+    """
+    Validate the bitset engine returns the same findings as the loop engine
+    :return: True/False
+    """
+    defaults_input = get_config.defaults("demo")
+    report = {
+        "networks": {},
+        "users": {
+            "user_" + str(count): defaults_input["users"]
+            | {"company_user": count % 2 == 0, "uses_mfa": count % 3 == 0}
+            for count in range(20)
+        },
+        "databases": {
+            "database_" + str(count): defaults_input["databases"]
+            | {"is_encrypted": count % 2 == 0}
+            for count in range(5)
+        },
+        "systems": {
+            "system_" + str(count): defaults_input["systems"]
+            | {"db_op": count % 2 == 0, "is_hardened": count % 4 == 0}
+            for count in range(10)
+        },
+    }
+
+    loop_results = resource_validator.main(security_checks_input, report)
+    bitset_results = resource_validator.main(
+        security_checks_input, report, check_engine="bitset"
+    )
+
+    assert len(loop_results) > 0
+    assert bitset_results == loop_results
+
+
+def test_worker_findings():
+    """
+    Validate checks split across worker processes return the same findings as the serial path
+    :return: True/False
+    """
+    defaults_input = get_config.defaults("demo")
+    report = {
+        "networks": {},
+        "users": {
+            "user_" + str(count): defaults_input["users"]
+            | {"company_user": count % 2 == 0}
+            for count in range(10)
+        },
+        "databases": {
+            "database_" + str(count): defaults_input["databases"]
+            | {"is_encrypted": count % 2 == 0}
+            for count in range(5)
+        },
+        "systems": {
+            "system_" + str(count): defaults_input["systems"]
+            | {"db_op": count % 2 == 0}
+            for count in range(5)
+        },
+    }
+
+    serial_results = resource_validator.main(security_checks_input, report)
+    worker_results = resource_validator.main(security_checks_input, report, workers=2)
+
+    assert len(serial_results) > 0
+    assert worker_results == serial_results
+
+
+def test_order_by_severity():
+    """
+    Validate checks are bucketed by severity, keeping file order within a severity
+    :return: True/False
+    """
+    security_checks = {
+        "low_first": {"severity": 3},
+        "high_first": {"severity": 1},
+        "low_second": {"severity": 3},
+        "medium": {"severity": 2},
+        "high_second": {"severity": 1},
+    }
+
+    assert resource_validator.order_by_severity(security_checks) == [
+        "high_first",
+        "high_second",
+        "medium",
+        "low_first",
+        "low_second",
+    ]
+
+
+def test_scope_name_collision():
+    """
+    Validate a system and a database with the same name are both checked
+    :return: True/False
+    """
+    defaults_input = get_config.defaults("demo")
+    report = {
+        "networks": {},
+        "users": {},
+        "databases": {"shared_name": defaults_input["databases"]},
+        "systems": {
+            "shared_name": defaults_input["systems"] | {"is_hardened": False},
+        },
+    }
+    scope_index = {}
+
+    for check_engine in resource_validator.CHECK_ENGINES:
+        results = resource_validator.main(
+            {"security_misconfig": security_checks_input["security_misconfig"]},
+            report,
+            check_engine=check_engine,
+        )
+        assert [result["resource"] for result in results] == ["shared_name"]
+
+    resources = resource_validator.scope_resources(
+        report, ["systems", "databases"], scope_index
+    )
+
+    assert len(resources) == 2
+    assert (
+        resource_validator.scope_resources(
+            report, ["systems", "databases"], scope_index
+        )
+        is resources
+    )
+
+
+def test_first_finding():
+    """
+    Validate the gate stops at the first finding at or below the severity threshold
+    :return: True/False
+    """
+    security_checks = {
+        "low_severity": security_checks_input["user_owned_device"] | {"severity": 3},
+        "high_severity": security_checks_input["user_owned_device"]
+        | {"name": "High severity", "severity": 1},
+    }
+
+    finding = resource_validator.first_finding(security_checks, output_report, 2)
+
+    assert finding["name"] == "High severity"
+    assert finding["resource"] == "test_user"
+    assert (
+        resource_validator.first_finding(
+            {"low_severity": security_checks["low_severity"]}, output_report, 2
+        )
+        is None
+    )
+
+
+def test_check_stats():
+    """
+    Validate per-check statistics are recorded for every check
+    :return: True/False
+    """
+    check_stats = {}
+    resource_validator.main(
+        {"user_owned_device": security_checks_input["user_owned_device"]},
+        output_report,
+        check_stats=check_stats,
+    )
+
+    assert list(check_stats.keys()) == ["user_owned_device"]
+    assert check_stats["user_owned_device"]["resources_evaluated"] == 2
+    assert check_stats["user_owned_device"]["findings"] == 1
+    assert check_stats["user_owned_device"]["match_rate"] == 0.5
+    assert check_stats["user_owned_device"]["seconds"] >= 0
+
+
+def test_run_check_yields_findings():
+    """
+    Validate a check yields its findings as found and records its statistics once exhausted
+    :return: True/False
+    """
+    security_checks = {"user_owned_device": security_checks_input["user_owned_device"]}
+    check_run = resource_validator.new_check_run(
+        security_checks,
+        output_report,
+        resource_validator.compile_checks(security_checks),
+    )
+    findings = resource_validator.run_check(check_run, "user_owned_device")
+
+    assert next(findings)["resource"] == "test_user"
+    assert check_run["check_stats"] == {}
+    assert list(findings) == []
+    assert check_run["check_stats"]["user_owned_device"]["findings"] == 1
+
+
+def test_adaptive_check_order(tmp_path):
+    """
+    Validate clause statistics are persisted and reordered checks return the same findings
+    :return: True/False
+    """
+    clause_stats = resource_validator.load_clause_stats(tmp_path)
+    first_results = resource_validator.main(
+        {"user_owned_device": security_checks_input["user_owned_device"]},
+        output_report,
+        clause_stats=clause_stats,
+    )
+    resource_validator.save_clause_stats(tmp_path, clause_stats)
+
+    clause_stats = resource_validator.load_clause_stats(tmp_path)
+    assert len(clause_stats) > 0
+
+    second_results = resource_validator.main(
+        {"user_owned_device": security_checks_input["user_owned_device"]},
+        output_report,
+        clause_stats=clause_stats,
+    )
+
+    assert second_results == first_results
@@ -320,3 +320,52 @@ def test_override_setting_system():
         assert True
     else:
         assert False
+
+
+def test_split_resource_files(tmp_path):
+    """
+    Test resources split across a directory of files are merged per resource type, matching the
+    single resources file, and that duplicate names across files are rejected.
+    :return: True/False
+    """
+    single_resources = get_config.resources(RESOURCES_FILE)
+    for resource_type, resources in single_resources["resources"].items():
+        os.makedirs(tmp_path / resource_type)
+        with open(tmp_path / resource_type / "resources.yaml", "w") as resources_file:
+            yaml.dump({"resources": {resource_type: resources}}, resources_file)
+
+    split_resources = get_config.resources(str(tmp_path))
+    for resource_type, resources in single_resources["resources"].items():
+        assert split_resources["resources"][resource_type] == resources
+
+    assert get_config.resources(str(tmp_path / "*" / "*.yaml")) == split_resources
+
+    with open(tmp_path / "users" / "duplicate.yml", "w") as resources_file:
+        yaml.dump(
+            {"resources": {"users": single_resources["resources"]["users"][:1]}},
+            resources_file,
+        )
+    with pytest.raises(ValueError, match="Duplicate users name"):
+        get_config.resources(str(tmp_path))
+
+
+def test_jsonl_resource_file(tmp_path):
+    """
+    Test a JSON Lines resources file is grouped per resource type, matching the YAML resources
+    file, and that lines without a valid type are rejected with their line number.
+    :return: True/False
+    """
+    single_resources = get_config.resources(RESOURCES_FILE)
+    with open(tmp_path / "resources.jsonl", "w") as resources_file:
+        for resource_type, resources in single_resources["resources"].items():
+            for resource in resources:
+                resources_file.write(
+                    json.dumps({"type": resource_type} | resource) + "\n"
+                )
+
+    assert get_config.resources(str(tmp_path / "resources.jsonl")) == single_resources
+
+    with open(tmp_path / "resources.jsonl", "a") as resources_file:
+        resources_file.write('{"type": "printer", "name": "test_printer"}\n')
+    with pytest.raises(ValueError, match="line"):
+        get_config.resources(str(tmp_path / "resources.jsonl"))